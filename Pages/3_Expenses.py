@@ -0,0 +1,4 @@
+from ledger.page import render
+from ledger.pages import EXPENSES
+
+render(EXPENSES)
@@ -0,0 +1,5 @@
+from ledger.page import query_page
+
+
+# Ad-hoc SQL over the ledger, for the cuts the other pages do not offer.
+query_page()
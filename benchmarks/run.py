@@ -0,0 +1,212 @@
+"""Headless benchmark of the dashboard on a synthetic export.
+
+Generates an export with benchmarks/synthetic.py, points the app at it through
+LEDGER_SOURCE (with a throwaway LEDGER_CACHE_DIR) in a fresh Python process, so
+the loader's module-level defaults and the process-wide caches start out as they
+do on a newly started server, and measures:
+
+  cold_load_s     load_ledger() with nothing published yet (CSV parse)
+  warm_load_s     load_ledger() in a fresh process state, attaching the published file
+  load_peak_mb    peak Python allocation during the cold load (tracemalloc)
+  compact_mb      the ledger in long form (ledger/compact.py), against dense_values_mb
+  compact_file_mb its file, against dense_file_mb (the published dense file)
+  densify_cogs_s  densifying the COGS page's columns from the long form
+  <page>_first_s  first run of each page through Streamlit's AppTest
+  <page>_rerun_s  median script time of the following reruns
+  peak_rss_mb     peak resident memory of the measuring process
+
+Results are compared with the stored baseline for the same scenario (years x
+accounts) and the run exits with status 1 if any figure regressed by more than
+the tolerance.
+
+    python benchmarks/run.py --years 3 --accounts 400
+    python benchmarks/run.py --years 3 --accounts 400 --save-baseline
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import synthetic  # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+PAGES = {
+    "home": ROOT / "Home.py",
+    "income": ROOT / "Pages" / "1_Income.py",
+    "cogs": ROOT / "Pages" / "2_COGS.py",
+    "expenses": ROOT / "Pages" / "3_Expenses.py",
+    "anomalies": ROOT / "Pages" / "4_Repair_Anomalies.py",
+    "sql": ROOT / "Pages" / "5_SQL.py",
+}
+
+# Timings below this many seconds are treated as equal; scheduler noise alone moves
+# them by more than any tolerance.
+NOISE_S = 0.02
+
+
+def _timed(call):
+    started = time.perf_counter()
+    result = call()
+    return time.perf_counter() - started, result
+
+
+# Load figures for `source`, which must also be LEDGER_SOURCE so that the pages run
+# afterwards see the same export and cache.
+def measure_loads(source, cache_dir):
+    from ledger import loader
+
+    for stale in cache_dir.glob("*.arrow"):
+        stale.unlink()
+    loader._loaded.clear()
+    tracemalloc.start()
+    cold, ledger = _timed(lambda: loader.load_ledger(source))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    loader._loaded.clear()
+    warm, _ = _timed(lambda: loader.load_ledger(source))
+    return {
+        "cold_load_s": cold,
+        "warm_load_s": warm,
+        "load_peak_mb": peak / 2**20,
+        "days": len(ledger.dates),
+        "accounts": len(ledger.accounts),
+        "dataset_mb": ledger.nbytes / 2**20,
+        **measure_compact(ledger),
+    }
+
+
+# The long storage format against the dense one (see ledger/compact.py): in memory,
+# as a published file, and the time to densify the columns of the widest page.
+def measure_compact(ledger):
+    from ledger.compact import CompactLedger
+    from ledger.pages import COGS
+    from ledger.shared import publish
+
+    compact = CompactLedger.from_ledger(ledger)
+    with tempfile.TemporaryDirectory() as tmp:
+        publish(ledger, Path(tmp) / "dense.arrow")
+        compact.write(Path(tmp) / "compact.arrow")
+        dense_file, compact_file = ((Path(tmp) / name).stat().st_size for name in ("dense.arrow", "compact.arrow"))
+    columns = COGS.columns(ledger.tree)
+    densify, _ = _timed(lambda: compact.ledger(columns))
+    return {
+        "cells": len(compact),
+        "dense_values_mb": ledger.values.nbytes / 2**20,
+        "compact_mb": compact.nbytes / 2**20,
+        "dense_file_mb": dense_file / 2**20,
+        "compact_file_mb": compact_file / 2**20,
+        "densify_cogs_s": densify,
+    }
+
+
+# First-run and median rerun script time of every page. Each page runs in its own
+# AppTest session against the ledger already loaded above, as it would on a server.
+def measure_pages(reruns):
+    from streamlit.testing.v1 import AppTest
+
+    results = {}
+    for name, script in PAGES.items():
+        app = AppTest.from_file(str(script), default_timeout=120)
+        first, _ = _timed(app.run)
+        if app.exception:
+            raise RuntimeError(f"{script.name} failed: {app.exception[0].message}")
+        times = [_timed(app.run)[0] for _ in range(reruns)]
+        results[f"{name}_first_s"] = first
+        results[f"{name}_rerun_s"] = statistics.median(times)
+    return results
+
+
+# The measuring half of the benchmark, run in the child process that run() starts
+# with LEDGER_SOURCE and LEDGER_CACHE_DIR already set. Prints the results as JSON.
+def measure(reruns):
+    os.chdir(ROOT)
+    results = measure_loads(Path(os.environ["LEDGER_SOURCE"]), Path(os.environ["LEDGER_CACHE_DIR"]))
+    results.update(measure_pages(reruns))
+    results["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps(results))
+
+
+def run(years, accounts, split_years, reruns, seed=0):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        paths = synthetic.generate(tmp / "exports", years, accounts, split_years=split_years, seed=seed)
+        env = dict(
+            os.environ,
+            LEDGER_SOURCE=str(tmp / "exports" if split_years else paths[0]),
+            LEDGER_CACHE_DIR=str(tmp / "cache"),
+        )
+        child = subprocess.run(
+            [sys.executable, __file__, "--measure", "--reruns", str(reruns)],
+            env=env, capture_output=True, text=True,
+        )
+    if child.returncode:
+        sys.exit(child.stderr)
+    return json.loads(child.stdout.strip().splitlines()[-1])
+
+
+# Figures that got worse than baseline * (1 + tolerance), as (name, baseline, now).
+def regressions(results, baseline, tolerance):
+    worse = []
+    for name, before in baseline.items():
+        now = results.get(name)
+        if now is None or not name.endswith(("_s", "_mb")):
+            continue
+        slack = NOISE_S if name.endswith("_s") else 0.0
+        if now > before * (1 + tolerance) + slack:
+            worse.append((name, before, now))
+    return worse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--accounts", type=int, default=None, help="numeric rows (default: as many as Fiscal_Y2D.CSV)")
+    parser.add_argument("--split-years", action="store_true", help="one export per year, loaded as a directory")
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, as a fraction")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the scenario's baseline")
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        return measure(args.reruns)
+
+    accounts = f"{args.accounts}a" if args.accounts else "template"
+    scenario = f"{args.years}y-{accounts}{'-split' if args.split_years else ''}"
+    results = run(args.years, args.accounts, args.split_years, args.reruns)
+    stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    baseline = stored.get(scenario, {})
+
+    print(f"scenario {scenario}: {results['days']} days x {results['accounts']} accounts")
+    for name, value in results.items():
+        before = baseline.get(name)
+        change = f"  ({(value - before) / before:+.0%} vs baseline)" if before else ""
+        shown = f"{value:10d}" if isinstance(value, int) else f"{value:10.3f}"
+        print(f"  {name:<16} {shown}{change}")
+
+    if args.save_baseline:
+        stored[scenario] = {name: round(value, 4) if isinstance(value, float) else value for name, value in results.items()}
+        args.baseline.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+        print(f"saved baseline for {scenario} to {args.baseline}")
+        return
+
+    worse = regressions(results, baseline, args.tolerance)
+    for name, before, now in worse:
+        print(f"REGRESSION {name}: {before:.3f} -> {now:.3f}")
+    sys.exit(1 if worse else 0)
+
+
+if __name__ == "__main__":
+    main()
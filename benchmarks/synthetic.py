@@ -0,0 +1,158 @@
+"""Write synthetic QuickBooks P&L exports shaped like Fiscal_Y2D.CSV.
+
+The account layout is copied from a template export (Fiscal_Y2D.CSV by default):
+the same blank section headers, "Total ..." rows, repeated labels ("Income",
+"Cost of Goods Sold", "Direct Labor"), summary lines and TOTAL column. Extra
+equipment, vehicle and material accounts are added to reach the requested account
+count, and daily amounts are drawn per account from the template's own nonzero rate
+and typical amount, so the files are as sparse as the real export.
+
+    python benchmarks/synthetic.py out/ --years 3 --accounts 400 --split-years
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from ledger.hierarchy import ACCOUNT, AccountTree  # noqa: E402
+from ledger.loader import DATE_FORMAT  # noqa: E402
+
+TEMPLATE = ROOT / "Fiscal_Y2D.CSV"
+
+# Groups that grow when more accounts are requested, with the label pattern of the
+# accounts added to them.
+GROWTH_GROUPS = {
+    "Equipment Repairs & Maintenance": "Unit {:04d}",
+    "Vehicle Repairs & Maintenance": "Truck {:04d}",
+    "Materials": "Material {:04d}",
+}
+
+
+# Labels and blank flags of the template rows, with extra accounts inserted before
+# the "- Other" row of each growth group until there are `accounts` numeric rows.
+def account_rows(accounts=None, template=TEMPLATE):
+    raw = pd.read_csv(template, index_col=0, usecols=lambda c: c != "TOTAL")
+    labels = list(raw.index)
+    blank = list(raw.isna().all(axis=1))
+    numeric = len(labels) - sum(blank)
+    extra = max(0, (accounts or numeric) - numeric)
+
+    per_group, remainder = divmod(extra, len(GROWTH_GROUPS))
+    rows = []
+    for label, is_blank in zip(labels, blank):
+        group = label[: -len(" - Other")] if label.endswith(" - Other") else None
+        if group in GROWTH_GROUPS:
+            count = per_group + (1 if remainder > 0 else 0)
+            remainder -= 1
+            rows += [(GROWTH_GROUPS[group].format(i + 1), False) for i in range(count)]
+        rows.append((label, is_blank))
+    return rows, raw.to_numpy(dtype=np.float64, na_value=0).T, labels
+
+
+# Daily amounts (days x rows) for the account rows. Leaf accounts copy the nonzero
+# rate and median nonzero amount of the template account with the same label (or of
+# their group's template accounts); Total rows and summary lines are then computed
+# from the leaves so the file is internally consistent.
+def daily_amounts(rows, days, template_values, template_labels, seed=0):
+    rng = np.random.default_rng(seed)
+    labels = [label for label, is_blank in rows if not is_blank]
+    tree = AccountTree.from_export([label for label, _ in rows], [is_blank for _, is_blank in rows])
+
+    template_columns = {}
+    for i, label in enumerate(template_labels):
+        template_columns.setdefault(label, i)
+    nonzero = template_values != 0
+    rate = nonzero.mean(axis=0)
+    typical = np.array([
+        np.median(np.abs(template_values[nonzero[:, i], i])) if nonzero[:, i].any() else 0.0
+        for i in range(template_values.shape[1])
+    ])
+    fallback = rate[typical > 0].mean(), np.median(typical[typical > 0])
+
+    values = np.zeros((days, len(labels)))
+    for i, label in enumerate(labels):
+        if tree.kinds[i] != ACCOUNT:
+            continue
+        j = template_columns.get(label)
+        p, scale = (rate[j], typical[j]) if j is not None and typical[j] > 0 else fallback
+        hits = rng.random(days) < p
+        amounts = rng.lognormal(np.log(max(scale, 1.0)), 0.8, hits.sum())
+        values[hits, i] = np.round(amounts, 2)
+        if label == "Discounts Given":
+            values[:, i] = -values[:, i]
+
+    values[:, tree.groups] = values @ tree.membership
+    column = tree.index.get
+    gross = values[:, column("Income")] - values[:, column("COGS")]
+    net_ordinary = gross - values[:, column("Expense")]
+    for path, series in (("Gross Profit", gross), ("Net Ordinary Income", net_ordinary), ("Net Income", net_ordinary)):
+        if column(path) is not None:
+            values[:, column(path)] = series
+    return labels, np.round(values, 2)
+
+
+def _quote(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+# Write the rows the way QuickBooks does: CRLF line endings, quoted labels and date
+# headers, bare amounts, and blank section headers with quoted empty cells.
+def write_export(path, rows, dates, values):
+    headers = [_quote(d.strftime(DATE_FORMAT).replace(" 0", " ")) for d in dates]
+    blank_cells = ',""' * len(dates) + ","
+    with open(path, "w", newline="") as f:
+        f.write("," + ",".join(headers) + ',"TOTAL"\r\n')
+        column = 0
+        for label, is_blank in rows:
+            if is_blank:
+                f.write(_quote(label) + blank_cells + "\r\n")
+                continue
+            amounts = values[:, column]
+            cells = np.char.mod("%.2f", amounts)
+            f.write(_quote(label) + "," + ",".join(cells) + f",{amounts.sum():.2f}\r\n")
+            column += 1
+
+
+# Write `years` years of daily data starting on Jan 1 of `start_year`, either as one
+# export or, with split_years, as one export per year in `out`. Returns the paths.
+def generate(out, years=1, accounts=None, start_year=2025, split_years=False, seed=0, template=TEMPLATE):
+    out = Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    rows, template_values, template_labels = account_rows(accounts, template)
+    dates = pd.date_range(f"{start_year}-01-01", f"{start_year + years - 1}-12-31", freq="D")
+    _, values = daily_amounts(rows, len(dates), template_values, template_labels, seed)
+
+    if not split_years:
+        path = out / "Fiscal_Synthetic.CSV"
+        write_export(path, rows, dates, values)
+        return [path]
+    paths = []
+    for year in range(start_year, start_year + years):
+        in_year = dates.year == year
+        path = out / f"Fiscal_{year}.CSV"
+        write_export(path, rows, dates[in_year], values[in_year])
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out", help="directory to write the export(s) to")
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--accounts", type=int, default=None, help="numeric rows (default: as many as the template)")
+    parser.add_argument("--start-year", type=int, default=2025)
+    parser.add_argument("--split-years", action="store_true", help="write one export per year")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for path in generate(args.out, args.years, args.accounts, args.start_year, args.split_years, args.seed):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+from ledger.compact import CompactLedger
+from ledger.cube import GRANULARITIES, RollupCube, period_start
+from ledger.dataset import Ledger
+from ledger.entities import EntitySet, load_entities
+from ledger.hierarchy import AccountTree
+from ledger.loader import (
+    DATA_PATH,
+    export_paths,
+    file_digest,
+    load_export,
+    load_exports,
+    load_ledger,
+    parse_dates,
+    read_export,
+    read_export_delta,
+    read_exports,
+)
+
+__all__ = [
+    "AccountTree",
+    "CompactLedger",
+    "DATA_PATH",
+    "EntitySet",
+    "GRANULARITIES",
+    "Ledger",
+    "RollupCube",
+    "export_paths",
+    "file_digest",
+    "load_entities",
+    "load_export",
+    "load_exports",
+    "load_ledger",
+    "parse_dates",
+    "period_start",
+    "read_export",
+    "read_export_delta",
+    "read_exports",
+]
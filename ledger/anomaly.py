@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+from ledger.cache import VersionCache
+from ledger.perf import stage
+
+
+# Weeks in the trailing baseline each week is compared with, and the fewest of them
+# a score needs.
+WINDOW = 8
+MIN_WEEKS = 4
+
+# Floors on the spread a deviation is divided by, so an account that is usually flat
+# (or usually zero) is not flagged for every few dollars: a share of its baseline
+# level and an absolute amount.
+RELATIVE_SPREAD = 0.25
+MIN_SPREAD = 100.0
+
+
+# Rolling baselines and deviation scores of every account, week by week.
+#
+# Works on the ledger's weekly cube (weeks x accounts). For week t the baseline is
+# the mean of the WINDOW weeks before it and the spread their standard deviation
+# (floored, see above), both read from prefix sums of the weekly amounts and their
+# squares, so every week of every account is scored in a handful of whole-matrix
+# operations. The score is (amount - baseline) / spread: positive for a cost above
+# its usual level.
+#
+# update() scores a ledger that extends this one with later days by re-scoring only
+# from the last (possibly partial) week onward; the weekly prefix sums continue
+# from where they stopped.
+class AnomalyScores:
+    def __init__(self, ledger, window=WINDOW, min_weeks=MIN_WEEKS, _previous=None):
+        self.window = window
+        self.min_weeks = min_weeks
+        self.version = ledger.version
+        self.accounts = ledger.accounts
+        self.days = len(ledger.dates)
+        self.last_date = ledger.dates[-1] if self.days else None
+        self.last_cumulative = ledger.cumulative[-1].copy()
+        self.weeks = ledger.cube.periods["Week"]
+        self.amounts = np.asarray(ledger.cube.sums["Week"], dtype=np.float64)
+
+        n, accounts = self.amounts.shape
+        first = 0 if _previous is None else max(0, len(_previous.weeks) - 1)
+        self._sums = np.zeros((n + 1, accounts))
+        self._squares = np.zeros((n + 1, accounts))
+        if first:
+            self._sums[: first + 1] = _previous._sums[: first + 1]
+            self._squares[: first + 1] = _previous._squares[: first + 1]
+        np.cumsum(self.amounts[first:], axis=0, out=self._sums[first + 1:])
+        np.cumsum(self.amounts[first:] ** 2, axis=0, out=self._squares[first + 1:])
+        self._sums[first + 1:] += self._sums[first]
+        self._squares[first + 1:] += self._squares[first]
+
+        self.baseline = np.zeros((n, accounts))
+        self.spread = np.zeros((n, accounts))
+        self.scores = np.zeros((n, accounts))
+        if first:
+            self.baseline[:first] = _previous.baseline[:first]
+            self.spread[:first] = _previous.spread[:first]
+            self.scores[:first] = _previous.scores[:first]
+        self._score(first)
+
+    def _score(self, first):
+        t = np.arange(first, len(self.weeks))
+        lo = np.maximum(t - self.window, 0)
+        count = (t - lo)[:, None]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = (self._sums[t] - self._sums[lo]) / count
+            variance = (self._squares[t] - self._squares[lo]) / count - mean ** 2
+        spread = np.maximum(np.sqrt(np.maximum(variance, 0.0)), np.maximum(RELATIVE_SPREAD * np.abs(mean), MIN_SPREAD))
+        scores = (self.amounts[first:] - mean) / spread
+        scores[(count < self.min_weeks).ravel()] = 0.0
+        self.baseline[first:] = np.nan_to_num(mean)
+        self.spread[first:] = spread
+        self.scores[first:] = np.nan_to_num(scores)
+
+    # Scores for `ledger`. If it is this ledger with later days appended (same
+    # accounts, same last date and running totals at the old end), only the weeks from
+    # the old last week onward are scored; otherwise everything is.
+    def update(self, ledger):
+        if ledger.version == self.version:
+            return self
+        return AnomalyScores(ledger, self.window, self.min_weeks, self if self.extended_by(ledger) else None)
+
+    # Whether `ledger` is this ledger with later days appended.
+    def extended_by(self, ledger):
+        return (
+            ledger.accounts == self.accounts
+            and len(ledger.dates) > self.days > 0
+            and ledger.dates[self.days - 1] == self.last_date
+            and np.allclose(ledger.cumulative[self.days], self.last_cumulative, rtol=0, atol=0.005)
+        )
+
+    # The `n` highest-scoring of `columns` over the weeks starting in [start, end], one
+    # row per account at its worst week, keeping those scoring at least `threshold`.
+    def top(self, tree, columns, start, end, n=15, threshold=3.0):
+        lo = np.searchsorted(self.weeks, np.datetime64(start, "D"), side="left")
+        hi = np.searchsorted(self.weeks, np.datetime64(end, "D"), side="right")
+        columns = np.asarray(columns, dtype=np.intp)
+        if hi <= lo or not len(columns):
+            return _ranking([], [], [], [], [], [], [])
+
+        scores = self.scores[lo:hi, columns]
+        worst = scores.argmax(axis=0)
+        peak = scores[worst, np.arange(len(columns))]
+        order = np.argsort(-peak, kind="stable")
+        order = order[peak[order] >= threshold][:n]
+        rows, cols = lo + worst[order], columns[order]
+        return _ranking(
+            [tree.labels[c] for c in cols],
+            [tree.labels[tree.parents[c]].removeprefix("Total ") if tree.parents[c] >= 0 else "" for c in cols],
+            self.weeks[rows],
+            self.amounts[rows, cols],
+            self.baseline[rows, cols],
+            peak[order],
+            [tree.paths[c] for c in cols],
+        )
+
+    # Weekly amount and baseline of one account, for charting.
+    def history(self, column, start, end):
+        lo = np.searchsorted(self.weeks, np.datetime64(start, "D"), side="left")
+        hi = np.searchsorted(self.weeks, np.datetime64(end, "D"), side="right")
+        return pd.DataFrame({
+            "Week": self.weeks[lo:hi].astype("datetime64[ns]"),
+            "Amount": np.round(self.amounts[lo:hi, column], 2),
+            "Baseline": np.round(self.baseline[lo:hi, column], 2),
+        })
+
+
+def _ranking(units, groups, weeks, amounts, baselines, scores, paths):
+    return pd.DataFrame({
+        "Unit": units,
+        "Group": groups,
+        "Week": np.asarray(weeks, dtype="datetime64[ns]"),
+        "Amount": np.round(np.asarray(amounts, dtype=np.float64), 2),
+        "Baseline": np.round(np.asarray(baselines, dtype=np.float64), 2),
+        "Score": np.round(np.asarray(scores, dtype=np.float64), 1),
+        "Path": paths,
+    })
+
+
+anomalies = VersionCache("anomalies")
+
+
+# The scores for `ledger`, kept per ledger version and window size for the process.
+# A ledger that extends one already scored (the same entity, refreshed with new
+# days) is scored incrementally from it.
+def anomaly_scores(ledger, window=WINDOW):
+    def build():
+        with stage("anomalies"):
+            for scores in reversed(anomalies.values()):
+                if scores.window == window and scores.extended_by(ledger):
+                    return scores.update(ledger)
+            return AnomalyScores(ledger, window)
+
+    return anomalies.get_or_build((ledger.version, window), build)
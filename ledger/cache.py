@@ -0,0 +1,128 @@
+import os
+import threading
+from collections import OrderedDict
+
+from ledger.perf import charge
+
+
+# Process-wide LRU cache bounded by the bytes of what it holds, shared by every
+# session and page.
+#
+# Each session used to keep its own filtered frame, period sums and figures; most
+# sessions look at the same few views, so those derived objects are kept here once
+# under a key that covers everything they depend on, and sessions only hold
+# references. Entries are charged the size their builder reports against
+# `max_bytes` and the least recently used ones are evicted past it. Cached values
+# are shared, so callers must not modify them.
+#
+# Every lookup charges the entry's size to the current rerun (see perf.charge), which
+# is how a session's memory is reported.
+class LRUCache:
+    def __init__(self, name, max_bytes):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    # The value cached under `key`, or build() it. build returns (value, nbytes).
+    def get_or_build(self, key, build):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if entry is not None:
+            charge(self.name, entry[1])
+            return entry[0]
+
+        value, size = build()
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = (value, size)
+                self.nbytes += size
+                while self.nbytes > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self.nbytes -= evicted
+                    self.evictions += 1
+        charge(self.name, size)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Ledger versions a VersionCache keeps: one per entity and the consolidation, with
+# room for the versions a refresh replaces.
+CACHED_VERSIONS = int(os.environ.get("LEDGER_CACHED_VERSIONS", 8))
+
+
+# Process-wide cache of an object built once per ledger version (a fitted model, a
+# query database), keeping the `size` most recently used.
+#
+# Every entity's ledger has its own version (see ledger/entities.py), so sessions on
+# different entities each find theirs instead of evicting one another's. Builds are
+# serialized, so sessions that ask for the same new version at once build it once.
+class VersionCache:
+    def __init__(self, name, size=CACHED_VERSIONS):
+        self.name = name
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    # The cached objects, least recently used first.
+    def values(self):
+        with self._lock:
+            return list(self._entries.values())
+
+    # The object cached under `key`, or build() it.
+    def get_or_build(self, key, build):
+        value = self._get(key)
+        if value is not None:
+            return value
+        with self._build_lock:
+            value = self._get(key)
+            if value is None:
+                value = build()
+                with self._lock:
+                    self._entries[key] = value
+                    while len(self._entries) > self.size:
+                        self._entries.popitem(last=False)
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,157 @@
+import os
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from ledger.cache import LRUCache
+from ledger.perf import stage
+
+
+# Above this many plotted points (series x periods) a chart is drawn with WebGL
+# traces instead of SVG, which the browser redraws far faster.
+WEBGL_POINTS = 2000
+
+# Longest series sent to the browser. Longer ones (daily data across several years)
+# are downsampled with LTTB, which keeps the peaks and troughs a reader looks for.
+MAX_POINTS = 500
+
+# Markers stop helping readability, and cost a DOM node each in SVG, beyond this
+# many points per series.
+MARKER_POINTS = 120
+
+
+# Largest-Triangle-Three-Buckets downsampling of several series sharing one x axis.
+#
+# `x` is a float vector of length n and `y` an (n, series) matrix. Returns a
+# (threshold, series) matrix of row indices: the first and last rows, plus the row
+# in each bucket that forms the largest triangle with the previously kept point and
+# the average of the next bucket. Buckets are walked once and every series is
+# handled in the same NumPy operations.
+def lttb(x, y, threshold):
+    n, series = y.shape
+    if threshold >= n or threshold < 3:
+        return np.repeat(np.arange(n)[:, None], series, axis=1)
+
+    columns = np.arange(series)
+    sampled = np.empty((threshold, series), dtype=np.intp)
+    sampled[0] = 0
+    sampled[-1] = n - 1
+    every = (n - 2) / (threshold - 2)
+    a = np.zeros(series, dtype=np.intp)
+    for i in range(threshold - 2):
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        next_hi = min(int((i + 2) * every) + 1, n)
+        avg_x = x[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean(axis=0)
+
+        ax, ay = x[a], y[a, columns]
+        area = np.abs((ax - avg_x) * (y[lo:hi] - ay) - (ax - x[lo:hi, None]) * (avg_y - ay))
+        a = lo + area.argmax(axis=0)
+        sampled[i + 1] = a
+    return sampled
+
+
+# px.line for the dashboard's period charts, sized for the data it is given.
+#
+# With several series, the ones that are zero over the whole range are left out, so
+# idle equipment and trucks are never serialized. Series longer than MAX_POINTS are
+# downsampled with LTTB, each keeping its own rows, and drawn as plain graph_objects
+# traces laid out like px.line's (px spends most of its time regrouping long-form
+# data). Large charts switch to WebGL traces.
+def line_chart(data_frame, x, y, title=None, markers=False):
+    names = [y] if isinstance(y, str) else list(y or [])
+    if len(names) > 1:
+        values = data_frame[names].to_numpy()
+        names = [name for name, nonzero in zip(names, values.any(axis=0)) if nonzero]
+    points = len(data_frame) * len(names)
+    render_mode = "webgl" if points > WEBGL_POINTS else "svg"
+    markers = markers and len(data_frame) <= MARKER_POINTS
+
+    if len(data_frame) <= MAX_POINTS or not names:
+        y = y if isinstance(y, str) else names
+        return px.line(data_frame, x=x, y=y, title=title, markers=markers, render_mode=render_mode)
+
+    dates = data_frame[x].to_numpy()
+    values = data_frame[names].to_numpy(dtype=np.float64)
+    keep = lttb(dates.astype("datetime64[s]").astype(np.float64), values, MAX_POINTS)
+    trace = go.Scattergl if render_mode == "webgl" else go.Scatter
+    mode = "lines+markers" if markers else "lines"
+    if isinstance(y, str):
+        traces = [trace(x=dates[keep[:, 0]], y=values[keep[:, 0], 0], mode=mode, showlegend=False,
+                        hovertemplate=f"{x}=%{{x}}<br>{y}=%{{y}}<extra></extra>")]
+        y_title, legend_title = y, None
+    else:
+        traces = [
+            trace(x=dates[keep[:, i]], y=values[keep[:, i], i], name=name, legendgroup=name, mode=mode,
+                  hovertemplate=f"variable={name}<br>{x}=%{{x}}<br>value=%{{y}}<extra></extra>")
+            for i, name in enumerate(names)
+        ]
+        y_title, legend_title = "value", "variable"
+    fig = go.Figure(traces)
+    return fig.update_layout(title=title, xaxis_title=x, yaxis_title=y_title, legend_title_text=legend_title,
+                             legend_tracegroupgap=0, margin={"t": 60})
+
+
+# Memory budget of the shared figure cache, in megabytes of serialized figure JSON.
+FIGURE_CACHE_MB = float(os.environ.get("LEDGER_FIGURE_CACHE_MB", 64))
+
+# Built figures, shared by every session and page (see LRUCache).
+#
+# Building a px figure costs far more than anything else in a rerun, and most
+# visitors look at the same default views, so figures are memoized and charged
+# their serialized JSON size.
+#
+# The figure object itself is kept rather than its JSON: st.plotly_chart serializes
+# whatever it is given, and turning cached JSON back into a figure costs about three
+# times as much as serializing a kept one. Cached figures are shared, so callers must
+# not modify them.
+figure_cache = LRUCache("figures", int(FIGURE_CACHE_MB * 1024 * 1024))
+
+
+# A dotted comparison trace named `name` on top of a chart, e.g. last year's weekly
+# totals moved onto this year's weeks. Long series are downsampled like line_chart's.
+def add_overlay(fig, name, x, y):
+    x, y = np.asarray(x), np.asarray(y, dtype=np.float64)
+    if len(x) > MAX_POINTS:
+        keep = lttb(x.astype("datetime64[s]").astype(np.float64), y[:, None], MAX_POINTS)[:, 0]
+        x, y = x[keep], y[keep]
+    trace = go.Scattergl if len(x) > WEBGL_POINTS else go.Scatter
+    fig.add_trace(trace(x=x, y=y, name=name, mode="lines", line={"dash": "dot"}, opacity=0.7,
+                        hovertemplate=f"{name}<br>%{{x}}<br>%{{y}}<extra></extra>"))
+    fig.update_layout(showlegend=True)
+    return fig
+
+
+# A dashed "Forecast" trace continuing a single-series chart, from Forecast.segment().
+def add_projection(fig, x, y):
+    trace = go.Scattergl if len(x) > WEBGL_POINTS else go.Scatter
+    fig.add_trace(trace(x=x, y=y, name="Forecast", mode="lines", line={"dash": "dash"}, opacity=0.8,
+                        hovertemplate="Forecast<br>%{x}<br>%{y}<extra></extra>"))
+    fig.update_layout(showlegend=True)
+    return fig
+
+
+# line_chart() through the shared figure cache. `view` identifies the data behind
+# period_data, normally (ledger.version, start_date, end_date); the granularity,
+# series, title and markers are added from the arguments, so two charts only share
+# a figure when they would draw the same thing. `overlay` is an optional
+# (name, x, y) comparison trace; its name must identify its data within the view,
+# as "Same period last year" does. `projection` is an optional (x, y) forecast
+# segment, which the ledger version and the granularity determine.
+def cached_line_chart(view, data_frame, x, y, title=None, markers=False, overlay=None, projection=None):
+    series = y if isinstance(y, str) else tuple(y or ())
+    key = (*view, x, series, title, markers, overlay[0] if overlay is not None else None, projection is not None)
+
+    def build():
+        with stage("figure_build"):
+            fig = line_chart(data_frame, x=x, y=y, title=title, markers=markers)
+            if overlay is not None:
+                add_overlay(fig, *overlay)
+            if projection is not None:
+                add_projection(fig, *projection)
+            return fig, len(pio.to_json(fig, validate=False))
+
+    return figure_cache.get_or_build(key, build)
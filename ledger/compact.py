@@ -0,0 +1,123 @@
+import json
+import os
+
+import numpy as np
+
+from ledger.dataset import Ledger
+from ledger.hierarchy import AccountTree
+
+
+# A ledger stored long: one (date_idx, account_id, amount) row per non-zero cell
+# instead of a dense days x accounts matrix.
+#
+# Most cells of an export are 0.00 (most accounts see a few entries a month), so
+# across years and entities the long form is several times smaller than the matrix,
+# in memory and on disk. Dates and accounts are dictionary-encoded: `date_idx`
+# (int32) indexes `dates`, and `account_id` (int16 while there are fewer than 32768
+# accounts) indexes the account tree, which keeps the paths, labels and hierarchy
+# once instead of per cell.
+#
+# Cells are sorted by account and then date, so each account's cells are one run,
+# `offsets[a]:offsets[a + 1]`, and dense() scatters only the runs of the columns it is
+# asked for.
+class CompactLedger:
+    def __init__(self, dates, tree, date_idx, account_ids, amounts, version=None):
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.tree = tree
+        self.date_idx = date_idx
+        self.account_ids = account_ids
+        self.amounts = amounts
+        self.version = version
+        self.offsets = np.searchsorted(account_ids, np.arange(len(tree) + 1)).astype(np.int64)
+
+    @classmethod
+    def from_ledger(cls, ledger):
+        accounts, days = np.nonzero(ledger.values.T)
+        id_dtype = np.int16 if len(ledger.tree) <= np.iinfo(np.int16).max else np.int32
+        return cls(
+            ledger.dates,
+            ledger.tree,
+            days.astype(np.int32),
+            accounts.astype(id_dtype),
+            np.ascontiguousarray(ledger.values.T[accounts, days]),
+            ledger.version,
+        )
+
+    def __len__(self):
+        return len(self.amounts)
+
+    @property
+    def nbytes(self):
+        cells = self.date_idx.nbytes + self.account_ids.nbytes + self.amounts.nbytes
+        return cells + self.dates.nbytes + self.offsets.nbytes
+
+    # The dense days x len(columns) matrix of the given account columns (all of them by
+    # default), in their order. Only the cells of those accounts are touched.
+    def dense(self, columns=None):
+        columns = np.arange(len(self.tree)) if columns is None else np.asarray(columns, dtype=np.intp)
+        starts, ends = self.offsets[columns], self.offsets[columns + 1]
+        counts = ends - starts
+        cells = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        values = np.zeros((len(self.dates), len(columns)), dtype=self.amounts.dtype)
+        values[self.date_idx[cells], np.repeat(np.arange(len(columns)), counts)] = self.amounts[cells]
+        return values
+
+    # A Ledger of only the named accounts (paths or labels, as Ledger.columns takes),
+    # for a page that needs a few dozen columns of a wide ledger. Its tree is flat but
+    # keeps the paths and labels, so the same names look the columns up. Without
+    # names it is the whole ledger, with its tree.
+    def ledger(self, names=None):
+        if names is None:
+            return Ledger(self.dates, self.tree.paths, self.dense(), self.tree, self.version)
+        index = dict(self.tree.index)
+        for i, label in enumerate(self.tree.labels):
+            index.setdefault(label, i)
+        if isinstance(names, dict):
+            names = names.values()
+        columns = list(dict.fromkeys(index[name] for name in names))
+        tree = AccountTree([self.tree.paths[c] for c in columns], [self.tree.labels[c] for c in columns],
+                           [-1] * len(columns), [self.tree.kinds[c] for c in columns])
+        return Ledger(self.dates, tree.paths, self.dense(columns), tree, self.version)
+
+    # Write as an uncompressed Arrow IPC file, like shared.publish(): the cells are the
+    # columns `date_idx`, `account` (dictionary<int16, string> of paths, the ids being
+    # the indices) and `amount`; the dates, the rest of the tree and the version go
+    # in the schema metadata.
+    def write(self, path):
+        import pyarrow as pa
+
+        metadata = {
+            "version": self.version,
+            "dates": self.dates.astype(np.int64).tolist(),
+            "labels": self.tree.labels,
+            "parents": self.tree.parents.tolist(),
+            "kinds": self.tree.kinds,
+        }
+        table = pa.table({
+            "date_idx": pa.array(self.date_idx),
+            "account": pa.DictionaryArray.from_arrays(pa.array(self.account_ids), pa.array(self.tree.paths)),
+            "amount": pa.array(self.amounts),
+        }).replace_schema_metadata({"ledger": json.dumps(metadata)})
+
+        tmp_path = path.with_suffix(".tmp")
+        with pa.OSFile(str(tmp_path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+
+    # Map a file written by write(); the cell arrays are read-only views onto it.
+    @classmethod
+    def read(cls, path):
+        import pyarrow as pa
+
+        table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        metadata = json.loads(table.schema.metadata[b"ledger"])
+        account = table.column("account").chunk(0)
+        tree = AccountTree(account.dictionary.to_pylist(), metadata["labels"], metadata["parents"], metadata["kinds"])
+        return cls(
+            np.asarray(metadata["dates"], dtype=np.int64).view("datetime64[D]"),
+            tree,
+            table.column("date_idx").chunk(0).to_numpy(zero_copy_only=True),
+            account.indices.to_numpy(zero_copy_only=True),
+            table.column("amount").chunk(0).to_numpy(zero_copy_only=True),
+            metadata["version"],
+        )
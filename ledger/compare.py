@@ -0,0 +1,29 @@
+import pandas as pd
+
+
+# Comparison modes, keyed by the label the sidebar shows.
+COMPARISONS = {
+    "Previous period": "previous",
+    "Same period last year": "last_year",
+}
+
+
+# The date range that [start, end] is compared with, and the offset that moves a
+# date of that range onto the matching date of [start, end] (for overlaying its
+# series on the current one). "previous" is the equal-length range ending the day
+# before `start`; "last_year" is the same dates a year earlier, Feb 29 mapping to
+# Feb 28.
+def comparison_range(start, end, mode):
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    if mode == "previous":
+        offset = end - start + pd.Timedelta(days=1)
+    elif mode == "last_year":
+        offset = pd.DateOffset(years=1)
+    else:
+        raise ValueError(f"Unknown comparison {mode!r}")
+    return (start - offset).date(), (end - offset).date(), offset
+
+
+# "+$1,234.56" / "-$1,234.56", the form st.metric colours by its leading sign.
+def signed_money(amount):
+    return f"{'-' if amount < 0 else '+'}${abs(amount):,.2f}"
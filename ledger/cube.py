@@ -0,0 +1,78 @@
+import numpy as np
+
+
+# Chart granularities, keyed by the period column name the pages plot on, with the
+# adjective used in chart titles.
+GRANULARITIES = {
+    "Day": "Daily",
+    "Week": "Weekly",
+    "Month": "Monthly",
+    "Quarter": "Quarterly",
+}
+
+# The exports run January to December, so fiscal quarters are calendar quarters.
+# Set to the first month of the fiscal year for a business that closes elsewhere.
+FISCAL_YEAR_START_MONTH = 1
+
+
+# First day of the period each date falls in. Weeks start on Monday (ISO weeks);
+# 1970-01-01 (day 0) was a Thursday, which is weekday 3 when Monday is 0.
+def period_start(dates, granularity):
+    days = dates.astype("datetime64[D]")
+    if granularity == "Day":
+        return days
+    if granularity == "Week":
+        n = days.astype(np.int64)
+        return (n - (n + 3) % 7).astype("datetime64[D]")
+    months = days.astype("datetime64[M]").astype(np.int64)
+    if granularity == "Quarter":
+        offset = FISCAL_YEAR_START_MONTH - 1
+        months = (months - offset) // 3 * 3 + offset
+    elif granularity != "Month":
+        raise ValueError(f"Unknown granularity {granularity!r}")
+    return months.astype("datetime64[M]").astype("datetime64[D]")
+
+
+# Per-period sums of every account at each granularity, built once per ledger.
+#
+# The ledger's rows are sorted, so every period is a contiguous run of rows starting
+# at `starts[g]` and its sums are a difference of two prefix-sum rows. A date-range
+# query reads the periods it overlaps straight out of the cube and recomputes only
+# the two edge periods that the range cuts, again from prefix sums.
+class RollupCube:
+    def __init__(self, dates, values, cumulative):
+        self.cumulative = cumulative
+        self.starts = {}
+        self.ends = {}
+        self.periods = {}
+        self.sums = {}
+        for granularity in GRANULARITIES:
+            keys = period_start(dates, granularity)
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.zeros(0, np.intp)
+            ends = np.r_[starts[1:], len(keys)].astype(np.intp)
+            self.starts[granularity] = starts
+            self.ends[granularity] = ends
+            self.periods[granularity] = keys[starts]
+            if granularity == "Day":
+                self.sums[granularity] = values
+            else:
+                self.sums[granularity] = cumulative[ends] - cumulative[starts]
+
+    @property
+    def nbytes(self):
+        return sum(s.nbytes for g, s in self.sums.items() if g != "Day")
+
+    # Period start dates and per-period sums of `columns` over rows [lo, hi).
+    def slice(self, granularity, lo, hi, columns):
+        starts, ends = self.starts[granularity], self.ends[granularity]
+        if lo >= hi:
+            return self.periods[granularity][:0], np.zeros((0, len(columns)))
+
+        first = np.searchsorted(starts, lo, side="right") - 1
+        last = np.searchsorted(starts, hi, side="left")
+        sums = self.sums[granularity][first:last][:, columns].astype(np.float64)
+        if starts[first] < lo:
+            sums[0] = self.cumulative[min(ends[first], hi), columns] - self.cumulative[lo, columns]
+        if ends[last - 1] > hi:
+            sums[-1] = self.cumulative[hi, columns] - self.cumulative[max(starts[last - 1], lo), columns]
+        return self.periods[granularity][first:last], sums
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+from ledger.cube import RollupCube
+from ledger.hierarchy import AccountTree
+from ledger.perf import stage
+
+
+# Running totals down each column with a leading zero row, so the sum of rows
+# [lo, hi) is cumulative[hi] - cumulative[lo]. Always float64: a float32 prefix sum
+# over several years of daily amounts would lose cents.
+def prefix_sums(values):
+    cumulative = np.zeros((values.shape[0] + 1, values.shape[1]), dtype=np.float64)
+    np.cumsum(values, axis=0, dtype=np.float64, out=cumulative[1:])
+    return cumulative
+
+
+def _as_day(value):
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+# The parsed ledger: one row per day, one column per account.
+#
+# `values` is a C-contiguous float matrix (dates x accounts) and `dates` is the sorted
+# datetime64[D] vector of its rows, so every aggregation below is a NumPy reduction
+# over a contiguous slice rather than pandas arithmetic on object columns.
+#
+# Columns are keyed by account path (see AccountTree). Lookups also accept a plain
+# label such as "Fuel" when no path has that name; a label shared by several
+# accounts ("Direct Labor") resolves to the first one in the export. Methods that
+# take `names` accept either a list of paths/labels, which also become the output
+# names, or a {output name: account} mapping such as AccountTree.named_children()
+# returns.
+#
+# A Ledger is never modified after construction; a refresh builds a new one (see
+# append()) and `version` identifies which export it was built from.
+class Ledger:
+    def __init__(self, dates, accounts, values, tree=None, version=None, cumulative=None):
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        values = np.asarray(values)
+        order = np.argsort(dates, kind="stable")
+        if not np.all(order == np.arange(len(dates))):
+            dates, values = dates[order], values[order]
+
+        self.dates = dates
+        self.tree = tree if tree is not None else AccountTree.flat(accounts)
+        self.accounts = self.tree.paths
+        self.values = np.ascontiguousarray(values)
+        self.cumulative = cumulative if cumulative is not None else prefix_sums(self.values)
+        self.version = version
+        self.cube = RollupCube(self.dates, self.values, self.cumulative)
+        self.index = dict(self.tree.index)
+        for i, label in enumerate(self.tree.labels):
+            self.index.setdefault(label, i)
+
+    # Pickle only the daily matrix and its labels; the prefix sums and the rollup cube
+    # are rebuilt on load, which is cheaper than shipping them between processes.
+    def __reduce__(self):
+        return (Ledger, (self.dates, self.accounts, self.values, self.tree, self.version))
+
+    @property
+    def start(self):
+        return pd.Timestamp(self.dates[0]).date()
+
+    @property
+    def end(self):
+        return pd.Timestamp(self.dates[-1]).date()
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.cumulative.nbytes + self.cube.nbytes + self.dates.nbytes
+
+    def columns(self, names):
+        if isinstance(names, dict):
+            names = names.values()
+        return np.array([self.index[name] for name in names], dtype=np.intp)
+
+    # Row bounds of the inclusive date range [start, end]. Dates are sorted, so this
+    # is two binary searches instead of a boolean mask over every row.
+    def bounds(self, start, end):
+        with stage("date_range"):
+            lo = np.searchsorted(self.dates, _as_day(start), side="left")
+            hi = np.searchsorted(self.dates, _as_day(end), side="right")
+        return lo, max(lo, hi)
+
+    # Sum of each named account over the date range, as a Series indexed by name. The
+    # range total is the difference of two prefix-sum rows, so the cost does not
+    # depend on how many days the range covers and nothing is copied. Amounts are in
+    # cents; rounding drops the float noise of the subtraction (and the "-0.00").
+    def totals(self, names, start, end):
+        lo, hi = self.bounds(start, end)
+        return self._totals(names, self.columns(names), lo, hi)
+
+    # Per-period sums of the named accounts over the date range at a granularity from
+    # GRANULARITIES ("Day", "Week", "Month" or "Quarter"), as a frame whose first
+    # column, named after the granularity, holds each period's first day. Periods cut
+    # by the range only count the days inside it.
+    def series(self, names, start, end, granularity="Week"):
+        lo, hi = self.bounds(start, end)
+        with stage("aggregate"):
+            return self._series(names, self.columns(names), lo, hi, granularity)
+
+    # totals() and series() of the same names in one pass: the date range is located
+    # and the columns looked up once, for a page that needs both for many accounts.
+    def aggregate(self, names, start, end, granularity="Week"):
+        lo, hi = self.bounds(start, end)
+        with stage("aggregate"):
+            columns = self.columns(names)
+            return self._totals(names, columns, lo, hi), self._series(names, columns, lo, hi, granularity)
+
+    def _totals(self, names, columns, lo, hi):
+        sums = self.cumulative[hi, columns] - self.cumulative[lo, columns]
+        return pd.Series(np.round(sums, 2) + 0.0, index=list(names))
+
+    def _series(self, names, columns, lo, hi, granularity):
+        periods, sums = self.cube.slice(granularity, lo, hi, columns)
+        period_data = pd.DataFrame(np.round(sums, 2) + 0.0, columns=list(names))
+        period_data.insert(0, granularity, periods.astype("datetime64[ns]"))
+        return period_data
+
+    # A new ledger with later days added after the last one, for exports that grow by
+    # a day at a time. The prefix sums continue from the current last row instead of
+    # being recomputed, and the rollup cube is rebuilt from them without touching the
+    # daily values again.
+    def append(self, dates, values, version=None):
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        if len(dates) and dates[0] <= self.dates[-1]:
+            raise ValueError("appended dates must come after the last date of the ledger")
+        values = np.asarray(values, dtype=self.values.dtype)
+        cumulative = np.empty((len(self.cumulative) + len(values), values.shape[1]), dtype=np.float64)
+        cumulative[: len(self.cumulative)] = self.cumulative
+        np.cumsum(values, axis=0, dtype=np.float64, out=cumulative[len(self.cumulative):])
+        cumulative[len(self.cumulative):] += self.cumulative[-1]
+        return Ledger(
+            np.concatenate([self.dates, dates]),
+            self.accounts,
+            np.concatenate([self.values, values]),
+            self.tree,
+            version,
+            cumulative,
+        )
+
+    # One time-ordered ledger from several, e.g. one export per fiscal year. Accounts
+    # are matched by path and an account missing from an export is zero on its days.
+    # Where exports overlap, the one that ends later wins the shared days (of two that
+    # end on the same day, the one that starts later).
+    @classmethod
+    def merge(cls, ledgers, version=None):
+        ledgers = sorted((l for l in ledgers if len(l.dates)), key=lambda l: (l.dates[-1], l.dates[0]))
+        tree, columns = AccountTree.merge([l.tree for l in ledgers])
+        dates = np.concatenate([l.dates for l in ledgers])
+        values = np.zeros((len(dates), len(tree)), dtype=ledgers[0].values.dtype)
+        row = 0
+        for ledger, cols in zip(ledgers, columns):
+            values[row:row + len(ledger.dates), cols] = ledger.values
+            row += len(ledger.dates)
+
+        _, first_reversed = np.unique(dates[::-1], return_index=True)
+        last = len(dates) - 1 - first_reversed
+        return cls(dates[last], tree.paths, values[last], tree, version)
@@ -0,0 +1,204 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ledger.dataset import Ledger
+from ledger.hierarchy import AccountTree
+from ledger.loader import (
+    DATA_PATH, _attach, _cache_name, _cache_path, _lock_path, _publish, export_paths, load_exports, load_ledger,
+)
+from ledger.perf import stage
+from ledger.shared import attach_arrays, exclusive
+
+
+# A directory with one entry per business unit: a QuickBooks export, or a directory
+# of one unit's exports (one per fiscal year, say). Entities are named after the
+# entries. Unset, the dashboard shows the single export at LEDGER_SOURCE.
+ENTITIES_PATH = os.environ.get("LEDGER_ENTITIES")
+
+# The name of the single entity when LEDGER_ENTITIES is unset.
+ENTITY_NAME = "Sierra Mining and Crushing"
+
+# The name of the consolidated view, listed first in the entity selector.
+CONSOLIDATED = "All entities"
+
+
+# {entity name: export source} of the entities under `path`, in name order.
+def entity_sources(path=ENTITIES_PATH):
+    if not path:
+        return {ENTITY_NAME: DATA_PATH}
+    entries = [p for p in Path(path).iterdir() if p.is_dir() or p.suffix.lower() == ".csv"]
+    if not entries:
+        raise FileNotFoundError(f"No entity exports found in {path}")
+    return {entry.stem: entry for entry in sorted(entries)}
+
+
+# Several entities' ledgers side by side, with their consolidation.
+#
+# Every entity is put on the union of their dates and their merged account tree
+# (AccountTree.merge, so an account only one unit has is zero for the others), and the
+# ledgers are stacked into one (entities + 1) x days x accounts array whose last layer
+# is their sum. The prefix sums of every layer come from one cumsum along the days,
+# so consolidation is a sum and a cumsum over arrays that were loaded anyway, and
+# aggregate() answers a query for every entity and the consolidation with the same
+# handful of array operations one ledger's query takes.
+#
+# Each layer is also a Ledger (views onto the stack, keyed by its own version), which
+# is what the pages draw: the page code, the caches and the models work on an
+# entity's ledger or the consolidated one alike. With a single entity its ledger is
+# used as it is.
+#
+# The stack can be published like a ledger (see ledger/shared.py): `stack` is one
+# mapped back by attach_arrays(), which is used instead of stacking the ledgers again.
+class EntitySet:
+    def __init__(self, ledgers, stack=None):
+        self.entities = list(ledgers)
+        self.key = [(name, ledger.version) for name, ledger in ledgers.items()]
+        parts = [ledgers[name] for name in self.entities]
+        if len(parts) == 1:
+            self.version = parts[0].version
+            self.ledgers = {self.entities[0]: parts[0]}
+            self.consolidated = parts[0]
+            self.dates, self.tree = parts[0].dates, parts[0].tree
+            self.values = parts[0].values[None]
+            self.cumulative = parts[0].cumulative[None]
+            return
+
+        self.version = _version(self.key)
+        if stack is not None:
+            self.dates, self.values, self.cumulative, self.tree, _ = stack
+        else:
+            self.tree, columns = AccountTree.merge([ledger.tree for ledger in parts])
+            self.dates = np.unique(np.concatenate([ledger.dates for ledger in parts]))
+            dtype = np.result_type(*(ledger.values.dtype for ledger in parts))
+            self.values = np.zeros((len(parts) + 1, len(self.dates), len(self.tree)), dtype=dtype)
+            for layer, ledger, cols in zip(self.values, parts, columns):
+                layer[np.searchsorted(self.dates, ledger.dates)[:, None], cols] = ledger.values
+            np.sum(self.values[:-1], axis=0, out=self.values[-1])
+            self.cumulative = np.zeros((len(parts) + 1, len(self.dates) + 1, len(self.tree)))
+            np.cumsum(self.values, axis=1, dtype=np.float64, out=self.cumulative[:, 1:])
+
+        names = [*self.entities, CONSOLIDATED]
+        tree = self.tree
+        self.ledgers = {
+            name: Ledger(self.dates, tree.paths, self.values[k], tree, f"{self.version}-{k}", self.cumulative[k])
+            for k, name in enumerate(names)
+        }
+        self.consolidated = self.ledgers[CONSOLIDATED]
+
+    def __len__(self):
+        return len(self.entities)
+
+    def __getitem__(self, name):
+        return self.ledgers[name]
+
+    # The choices of the entity selector: the consolidation first, then each entity.
+    @property
+    def names(self):
+        return [CONSOLIDATED, *self.entities] if len(self.entities) > 1 else list(self.entities)
+
+    # Ledger.aggregate() for every entity and the consolidation at once: the range
+    # totals as a frame with one row per entity (the consolidation last) and one
+    # column per name, and the per-period sums as {entity: frame}, each like
+    # Ledger.series() returns. Both are differences of prefix-sum rows taken across
+    # the whole stack in one indexing operation.
+    def aggregate(self, names, start, end, granularity="Week"):
+        ledger = self.consolidated
+        lo, hi = ledger.bounds(start, end)
+        with stage("aggregate"):
+            columns = ledger.columns(names)
+            labels = list(names)
+            rows = self._rows()
+            totals = self._totals(labels, columns, lo, hi)
+
+            # The periods the range overlaps, each cut to the range, as in RollupCube.slice.
+            starts, ends = ledger.cube.starts[granularity], ledger.cube.ends[granularity]
+            first, last = 0, 0
+            if lo < hi:
+                first = np.searchsorted(starts, lo, side="right") - 1
+                last = np.searchsorted(starts, hi, side="left")
+            period_lo = np.maximum(starts[first:last], lo)[:, None]
+            period_hi = np.minimum(ends[first:last], hi)[:, None]
+            period_sums = self.cumulative[:, period_hi, columns] - self.cumulative[:, period_lo, columns]
+            periods = ledger.cube.periods[granularity][first:last].astype("datetime64[ns]")
+            period_data = {}
+            for name, layer in zip(rows, period_sums):
+                frame = pd.DataFrame(np.round(layer, 2) + 0.0, columns=labels)
+                frame.insert(0, granularity, periods)
+                period_data[name] = frame
+        return totals, period_data
+
+    # Only the range totals of aggregate(), for the consolidated view's breakdown by
+    # entity, which has no use for the period sums.
+    def totals(self, names, start, end):
+        ledger = self.consolidated
+        lo, hi = ledger.bounds(start, end)
+        with stage("aggregate"):
+            return self._totals(list(names), ledger.columns(names), lo, hi)
+
+    def _rows(self):
+        return self.entities if len(self.entities) == 1 else [*self.entities, CONSOLIDATED]
+
+    def _totals(self, labels, columns, lo, hi):
+        sums = self.cumulative[:, hi, columns] - self.cumulative[:, lo, columns]
+        return pd.DataFrame(np.round(sums, 2) + 0.0, index=self._rows(), columns=labels)
+
+
+def _version(key):
+    stamp = " ".join(f"{name}:{version}" for name, version in key)
+    return hashlib.sha256(stamp.encode()).hexdigest()[:16]
+
+
+# The EntitySet of `ledgers`, its stack shared between processes like a ledger: a
+# process that finds this version published maps it, otherwise it stacks the
+# ledgers and publishes them, under a lock so replicas stack a new version once. The
+# files are named after the entities' common directory. Published stacks hold
+# float64, so other dtypes are stacked privately.
+def _consolidate(sources, ledgers, dtype):
+    if len(ledgers) == 1 or np.dtype(dtype) != np.float64:
+        return EntitySet(ledgers)
+    name = _cache_name(os.path.commonpath([Path(source).resolve() for source in sources.values()]), "entities")
+    cache_file = _cache_path(name, _version([(entity, ledger.version) for entity, ledger in ledgers.items()]))
+    stack = _attach(cache_file, attach_arrays)
+    if stack is None:
+        with exclusive(_lock_path(name)):
+            stack = _attach(cache_file, attach_arrays)
+            if stack is None:
+                entities = EntitySet(ledgers)
+                stack = _publish(entities, name, attach_arrays)
+                if stack is None:
+                    return entities
+    return EntitySet(ledgers, stack)
+
+
+_latest = None
+_lock = threading.Lock()
+
+
+# The entities of `sources` ({name: export source}, by default entity_sources()),
+# loaded and stacked once per set of export versions. Every export file behind them
+# is loaded in one load_exports() call, so cold exports are parsed in parallel and
+# then attached, and each entity's ledger comes from load_ledger() as usual.
+def load_entities(sources=None, dtype="float64"):
+    global _latest
+    sources = entity_sources() if sources is None else sources
+    if len(sources) == 1:
+        (name, source), = sources.items()
+        ledgers = {name: load_ledger(source, dtype)}
+    else:
+        with stage("load"):
+            load_exports([path for source in sources.values() for path in export_paths(source)], dtype)
+        ledgers = {name: load_ledger(source, dtype) for name, source in sources.items()}
+
+    key = [(name, ledger.version) for name, ledger in ledgers.items()]
+    entities = _latest
+    if entities is not None and entities.key == key:
+        return entities
+    with _lock, stage("consolidate"):
+        if _latest is None or _latest.key != key:
+            _latest = _consolidate(sources, ledgers, dtype)
+        return _latest
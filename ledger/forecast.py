@@ -0,0 +1,129 @@
+import numpy as np
+
+from ledger.cache import VersionCache
+from ledger.cube import FISCAL_YEAR_START_MONTH, RollupCube, period_start
+from ledger.dataset import prefix_sums
+from ledger.perf import stage
+
+
+# Complete weeks of history a model is fitted on, and the fewest it needs.
+HISTORY_WEEKS = 156
+MIN_WEEKS = 8
+
+# Annual Fourier harmonics in the model once the history covers SEASONAL_WEEKS.
+# With less than two years a yearly cycle cannot be told apart from the trend, so
+# shorter histories get a straight line.
+HARMONICS = 2
+SEASONAL_WEEKS = 104
+YEAR_WEEKS = 365.25 / 7
+
+
+# First and last day of the fiscal year `day` falls in.
+def fiscal_year(day):
+    month = np.datetime64(day, "D").astype("datetime64[M]").astype(np.int64)
+    offset = FISCAL_YEAR_START_MONTH - 1
+    first = (month - offset) // 12 * 12 + offset
+    start = np.int64(first).astype("datetime64[M]").astype("datetime64[D]")
+    end = np.int64(first + 12).astype("datetime64[M]").astype("datetime64[D]") - 1
+    return start, end
+
+
+# Intercept, trend and `harmonics` sine/cosine pairs of the yearly cycle, one row per
+# week number in `t`.
+def _design(t, harmonics):
+    t = np.asarray(t, dtype=np.float64)
+    columns = [np.ones_like(t), t]
+    for k in range(1, harmonics + 1):
+        angle = 2 * np.pi * k * t / YEAR_WEEKS
+        columns += [np.cos(angle), np.sin(angle)]
+    return np.column_stack(columns)
+
+
+# Trend (and, with enough history, seasonal) models of every account's weekly amount,
+# projected to the end of the fiscal year.
+#
+# Every account is fitted on the same complete weeks, so they share one design
+# matrix and a single least-squares solve fits them all: the weekly cube is the
+# right-hand side, one column per account. Models are linear in the data, so a
+# group's projection is the sum of its members' and Net Income's is income minus
+# costs, just like the actuals. Weeks the ledger only covers part of are left out of
+# the fit.
+#
+# The projected days (the day after the last one through the end of its fiscal
+# year, which is the next fiscal year when the ledger ends with one) are held as a
+# daily matrix with its own RollupCube, so a chart's projected periods at any
+# granularity are a slice, as for the actuals.
+class Forecast:
+    def __init__(self, ledger, history_weeks=HISTORY_WEEKS, harmonics=HARMONICS):
+        self.version = ledger.version
+        self.last_date = ledger.dates[-1]
+        self.year_start, self.year_end = fiscal_year(self.last_date + 1)
+        days = np.arange(self.last_date + 1, self.year_end + 1)
+
+        periods = ledger.cube.periods["Week"]
+        complete = (periods >= ledger.dates[0]) & (periods + 6 <= self.last_date)
+        weeks = periods[complete][-history_weeks:]
+        amounts = np.asarray(ledger.cube.sums["Week"][complete][-history_weeks:], dtype=np.float64)
+        self.weeks = len(weeks)
+        self.harmonics = 0
+        future = np.zeros((len(days), len(ledger.accounts)))
+        if self.weeks >= MIN_WEEKS:
+            base = weeks[0]
+            t = ((weeks - base) // 7).astype(np.int64)
+            span = int(t[-1]) + 1
+            self.harmonics = harmonics if span >= SEASONAL_WEEKS else 0
+            # A dense grid of weeks: a week with no rows at all (between merged exports)
+            # is a zero week, not a gap.
+            history = np.zeros((span, amounts.shape[1]))
+            history[t] = amounts
+            self.coefficients = np.linalg.lstsq(_design(np.arange(span), self.harmonics), history, rcond=None)[0]
+
+            day_weeks = ((period_start(days, "Week") - base) // 7).astype(np.int64)
+            future_weeks, rows = np.unique(day_weeks, return_inverse=True)
+            future = (_design(future_weeks, self.harmonics) @ self.coefficients)[rows] / 7
+        self.cube = RollupCube(days, future, prefix_sums(future))
+
+    @property
+    def fitted(self):
+        return self.weeks >= MIN_WEEKS
+
+    # Whether the ledger ends on the last day of a fiscal year, so the projection is of
+    # the whole next year rather than the rest of the current one.
+    @property
+    def next_year(self):
+        return self.year_start > self.last_date
+
+    # Projected total of each column from the day after the last one to year end.
+    def remainder(self, columns):
+        return self.cube.cumulative[-1, columns]
+
+    # The projected segment of `series` (ledger column `column`) on a chart of
+    # `period_data` at `granularity` that runs to the ledger's last day, as (x, y). It
+    # starts at the last complete actual period, so it joins the actual line, and the
+    # period the ledger ends part way through shows its actual amount plus the
+    # projected rest of it.
+    def segment(self, period_data, granularity, series, column):
+        x = self.cube.periods[granularity].astype("datetime64[ns]")
+        y = self.cube.sums[granularity][:, column].astype(np.float64)
+        actual_x = period_data[granularity].to_numpy()
+        actual_y = period_data[series].to_numpy(dtype=np.float64)
+        anchor = -1
+        if len(actual_x) and len(x) and actual_x[-1] == x[0]:
+            y[0] += actual_y[-1]
+            anchor = -2
+        if len(actual_x) >= -anchor:
+            x = np.r_[actual_x[anchor], x]
+            y = np.r_[actual_y[anchor], y]
+        return x, np.round(y, 2)
+
+
+forecasts = VersionCache("forecasts")
+
+
+# The fitted models for `ledger`, computed once per ledger version for the process.
+def forecast_for(ledger):
+    def build():
+        with stage("forecast"):
+            return Forecast(ledger)
+
+    return forecasts.get_or_build(ledger.version, build)
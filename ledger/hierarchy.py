@@ -0,0 +1,189 @@
+import numpy as np
+
+
+ACCOUNT = "account"
+TOTAL = "total"
+SUMMARY = "summary"
+
+
+# The account tree of a QuickBooks P&L export.
+#
+# Each numeric row of the export is one node, stored in row order so node i is column
+# i of the ledger matrix. A group (e.g. "Equipment Repairs & Maintenance") is the
+# node of its "Total ..." row and is named after it, so the Cost of Goods Sold
+# section becomes "COGS". Paths join group names with "/", e.g.
+# "COGS/Equipment Repairs & Maintenance/966H". Labels may contain "/" themselves
+# ("1/2\" Apache Red"), so paths are lookup keys and are never split.
+#
+# Child and descendant index arrays are built once, so "all children of X" is a dict
+# lookup, and `membership` maps every leaf account to each group above it so that
+# values @ membership rolls every subtree up in one matrix product.
+class AccountTree:
+    def __init__(self, paths, labels, parents, kinds):
+        self.paths = list(paths)
+        self.labels = list(labels)
+        self.parents = np.asarray(parents, dtype=np.intp)
+        self.kinds = list(kinds)
+        self.index = {path: i for i, path in enumerate(self.paths)}
+
+        n = len(self.paths)
+        self.groups = np.array([i for i in range(n) if self.kinds[i] == TOTAL], dtype=np.intp)
+        group_pos = {g: j for j, g in enumerate(self.groups)}
+        self._group_pos = {self.paths[g]: j for g, j in group_pos.items()}
+
+        children = {g: [] for g in self.groups}
+        descendants = {g: [] for g in self.groups}
+        self.membership = np.zeros((n, len(self.groups)))
+        for i in range(n):
+            if self.parents[i] >= 0:
+                children[self.parents[i]].append(i)
+            parent = self.parents[i]
+            while parent >= 0:
+                descendants[parent].append(i)
+                if self.kinds[i] == ACCOUNT:
+                    self.membership[i, group_pos[parent]] = 1.0
+                parent = self.parents[parent]
+
+        self._children = {self.paths[g]: np.array(c, dtype=np.intp) for g, c in children.items()}
+        self._descendants = {self.paths[g]: np.array(d, dtype=np.intp) for g, d in descendants.items()}
+        self.roots = np.flatnonzero(self.parents < 0)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def is_group(self, path):
+        return path in self._children
+
+    # Column indices of the direct children of a group, in export order. Subgroups
+    # appear as their Total column.
+    def children(self, path):
+        return self._children[path]
+
+    # Column indices of every node below a group, subgroup totals included.
+    def descendants(self, path):
+        return self._descendants[path]
+
+    # Column indices of the leaf accounts below a group; summing them gives the
+    # group total without double-counting subtotals. KeyError if `path` is not a group.
+    def leaves(self, path):
+        return np.flatnonzero(self.membership[:, self._group_pos[path]])
+
+    def parent(self, path):
+        parent = self.parents[self.index[path]]
+        return self.paths[parent] if parent >= 0 else None
+
+    # {label: path} for the given columns. Labels are unique below any one group in
+    # the export, so they make readable column names for charts and metrics; on a
+    # clash the path is used instead.
+    def named(self, columns):
+        named = {}
+        for i in columns:
+            label = self.labels[i]
+            named[label if label not in named else self.paths[i]] = self.paths[i]
+        return named
+
+    def named_children(self, path):
+        return self.named(self.children(path))
+
+    # Everything below a group plus the group's own Total row, e.g. every column of
+    # the COGS section ending with "Total COGS".
+    def named_descendants(self, path):
+        return self.named(list(self.descendants(path)) + [self.index[path]])
+
+    # Pickle only the defining lists; the index arrays and membership matrix are
+    # rebuilt on the other side, which is cheaper than shipping them to a worker.
+    def __reduce__(self):
+        return (AccountTree, (self.paths, self.labels, self.parents, self.kinds))
+
+    # Union of several trees, e.g. the same chart of accounts exported for different
+    # years with trucks and equipment added or retired in between. Nodes are matched
+    # by path. A node missing from the trees merged so far is inserted right after
+    # the node that precedes it in its own tree, which keeps new accounts inside
+    # their group (before its Total row) and keeps each export's order. Returns the
+    # merged tree and, for each input tree, the merged column of each of its nodes.
+    @classmethod
+    def merge(cls, trees):
+        order = []
+        info = {}
+        for tree in trees:
+            previous = None
+            for i, path in enumerate(tree.paths):
+                if path not in info:
+                    parent = tree.parents[i]
+                    info[path] = (tree.labels[i], tree.paths[parent] if parent >= 0 else None, tree.kinds[i])
+                    order.insert(order.index(previous) + 1 if previous is not None else 0, path)
+                previous = path
+
+        position = {path: i for i, path in enumerate(order)}
+        merged = cls(
+            order,
+            [info[path][0] for path in order],
+            [position[info[path][1]] if info[path][1] is not None else -1 for path in order],
+            [info[path][2] for path in order],
+        )
+        columns = [np.array([position[path] for path in tree.paths], dtype=np.intp) for tree in trees]
+        return merged, columns
+
+    # A tree with every row at the top level, for ledgers that carry no hierarchy.
+    @classmethod
+    def flat(cls, labels):
+        labels = list(labels)
+        return cls(labels, labels, [-1] * len(labels), [ACCOUNT] * len(labels))
+
+    # Rebuild the tree from the export's row order. `labels` lists every row of the
+    # export and `blank` flags the rows with no values on any day.
+    #
+    # A blank row opens a group and the next "Total ..." row closes the innermost open
+    # group. A group closed by a "Net ..." row instead ("Ordinary Income/Expense" is
+    # closed by "Net Ordinary Income") has no total of its own, so it is transparent:
+    # its members move up to its parent. "Net ..." rows and rows such as "Gross
+    # Profit" that sit outside any totalled group are summaries.
+    @classmethod
+    def from_export(cls, labels, blank):
+        rows = []
+        stack = []
+
+        def close(total_row):
+            group = stack.pop()
+            if total_row is None:
+                for row in rows:
+                    if row["parent"] is group:
+                        row["parent"] = stack[-1] if stack else None
+            else:
+                total_row["name"] = total_row["label"][len("Total "):]
+                total_row["parent"] = stack[-1] if stack else None
+                total_row["kind"] = TOTAL
+                for row in rows:
+                    if row["parent"] is group:
+                        row["parent"] = total_row
+
+        for label, is_blank in zip(labels, blank):
+            if is_blank:
+                stack.append(object())
+                continue
+            row = {"label": label, "name": label, "parent": stack[-1] if stack else None, "kind": ACCOUNT}
+            rows.append(row)
+            if label.startswith("Total ") and stack:
+                close(row)
+            elif label.startswith("Net ") and stack:
+                close(None)
+                row["parent"] = stack[-1] if stack else None
+                row["kind"] = SUMMARY
+        while stack:
+            close(None)
+
+        position = {id(row): i for i, row in enumerate(rows)}
+        for row in rows:
+            if row["kind"] == ACCOUNT and row["parent"] is None:
+                row["kind"] = SUMMARY
+
+        def path(row):
+            parent = row["parent"]
+            return row["name"] if parent is None else f"{path(parent)}/{row['name']}"
+
+        return cls(
+            [path(row) for row in rows],
+            [row["label"] for row in rows],
+            [position[id(row["parent"])] if row["parent"] is not None else -1 for row in rows],
+            [row["kind"] for row in rows],
+        )
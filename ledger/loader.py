@@ -0,0 +1,330 @@
+import glob
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ledger.dataset import Ledger
+from ledger.hierarchy import AccountTree
+from ledger.perf import stage
+from ledger.shared import attach, exclusive, publish
+
+
+ROOT = Path(__file__).resolve().parent.parent
+# The export(s) the dashboard shows: one file, a directory of exports (one per fiscal
+# year, say) or a glob such as "exports/*.CSV".
+DATA_PATH = os.environ.get("LEDGER_SOURCE", ROOT / "Fiscal_Y2D.CSV")
+CACHE_DIR = Path(os.environ.get("LEDGER_CACHE_DIR", ROOT / ".cache" / "ledger"))
+
+# Date headers in the QuickBooks export look like "Jan 1, 25".
+DATE_FORMAT = "%b %d, %y"
+
+# Upper bound on the processes used to parse several exports at once.
+MAX_WORKERS = os.cpu_count() or 1
+
+# Bump when the layout of the published ledger files changes.
+CACHE_VERSION = 4
+
+
+# Hash the raw bytes of the export. The digest names the on-disk cache file, so an
+# identical re-export (new mtime, same bytes) still hits the cache.
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Parse the wide export (one row per account, one column per day) straight into a
+# Ledger: the account rows become a float matrix and the date headers a date vector.
+# The first column holds labels and every other column is numeric, so nothing ever
+# passes through an object-dtype transpose.
+#
+# Section-header rows ("Ordinary Income/Expense", "Income", "Materials", ...) are
+# blank on every day. They are used to rebuild the account tree and then dropped, so
+# every remaining row, including repeated labels such as the two "Direct Labor"
+# lines, becomes a column with its own path.
+def read_export(path=DATA_PATH, dtype="float64"):
+    raw = pd.read_csv(path, index_col=0, usecols=lambda c: c != "TOTAL")
+    blank = raw.isna().all(axis=1).to_numpy()
+    tree = AccountTree.from_export(raw.index, blank)
+    raw = raw[~blank]
+
+    values = raw.to_numpy(dtype=dtype, na_value=0).T
+    return Ledger(parse_dates(raw.columns), tree.paths, values, tree)
+
+
+# Date headers as datetime64[D]. Exports normally use DATE_FORMAT; older ones or ones
+# with other report settings ("Jan 1, 2024", "01/01/2024") are parsed by inference.
+def parse_dates(headers):
+    try:
+        dates = pd.to_datetime(headers, format=DATE_FORMAT)
+    except ValueError:
+        dates = pd.to_datetime(headers, format="mixed")
+    return dates.to_numpy().astype("datetime64[D]")
+
+
+# Parse only the days added to an export since `ledger` was built from it.
+#
+# QuickBooks re-exports the year-to-date file with new date columns on the right, so
+# the header is compared with the ledger's dates and only the new columns and the
+# TOTAL column are converted. The earlier days are trusted only if the account rows
+# are the same and TOTAL equals the ledger's running totals plus the new days;
+# otherwise (a back-dated entry, a new account, an unrelated file) None is returned
+# and the caller parses the whole export.
+def read_export_delta(ledger, path=DATA_PATH, dtype="float64"):
+    header = pd.read_csv(path, nrows=0).columns
+    date_cols = [c for c in header[1:] if c != "TOTAL"]
+    if "TOTAL" not in header or len(date_cols) <= len(ledger.dates):
+        return None
+    dates = parse_dates(date_cols)
+    if not np.array_equal(dates[: len(ledger.dates)], ledger.dates):
+        return None
+
+    usecols = [0] + [header.get_loc(c) for c in date_cols[len(ledger.dates):]] + [header.get_loc("TOTAL")]
+    raw = pd.read_csv(path, index_col=0, usecols=usecols)
+    blank = raw.isna().all(axis=1).to_numpy()
+    tree = AccountTree.from_export(raw.index, blank)
+    if tree.paths != ledger.accounts:
+        return None
+    raw = raw[~blank]
+
+    values = raw.drop(columns=["TOTAL"]).to_numpy(dtype=dtype, na_value=0).T
+    expected = ledger.cumulative[-1] + values.sum(axis=0, dtype=np.float64)
+    if not np.allclose(raw["TOTAL"].to_numpy(na_value=0), expected, rtol=0, atol=0.01):
+        return None
+    return dates[len(ledger.dates):], values
+
+
+# The name of an export's cache and lock files: its stem, for reading, and a hash of
+# its resolved path, so that same-named exports in different directories (one
+# Fiscal_2025.CSV per entity, say) get files of their own.
+def _cache_name(path, stem=None):
+    path = Path(path).resolve()
+    return f"{stem or path.stem}-{hashlib.sha256(str(path).encode()).hexdigest()[:8]}"
+
+
+def _cache_path(name, digest):
+    return CACHE_DIR / f"{name}-{digest[:16]}-v{CACHE_VERSION}.arrow"
+
+
+# Publish `ledger` for every process (see ledger/shared.py) under the cache name
+# `name`, drop the files of older versions with that name and return the new file
+# mapped by `read`, so this process shares the published copy too. Failures
+# (read-only disk, missing pyarrow) only cost the sharing: None is returned and the
+# caller keeps its in-memory copy.
+def _publish(ledger, name, read=attach):
+    cache_file = _cache_path(name, ledger.version)
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        publish(ledger, cache_file)
+        for old in CACHE_DIR.glob(f"{glob.escape(name)}-{'?' * 16}-v{CACHE_VERSION}.arrow"):
+            if old != cache_file:
+                old.unlink(missing_ok=True)
+        return read(cache_file)
+    except Exception:
+        return None
+
+
+# The published ledger in `cache_file` mapped by `read`, or None if there is none (or
+# it is damaged, in which case it is removed and rebuilt).
+def _attach(cache_file, read=attach):
+    if not cache_file.exists():
+        return None
+    try:
+        return read(cache_file)
+    except Exception:
+        cache_file.unlink(missing_ok=True)
+        return None
+
+
+def _lock_path(name):
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        pass
+    return CACHE_DIR / f"{name}.lock"
+
+
+def _as_dtype(ledger, dtype):
+    if ledger.values.dtype == np.dtype(dtype):
+        return ledger
+    return Ledger(ledger.dates, ledger.accounts, ledger.values.astype(dtype), ledger.tree, ledger.version, ledger.cumulative)
+
+
+# Load the export through the shared, memory-mapped ledger files. If a process has
+# already published this version of the export, it is attached without parsing
+# anything. Otherwise, if `current` is a ledger built from an earlier version of the
+# same export, only the new days are parsed and appended to it; failing that the
+# whole export is parsed. The result is published for the other processes, under a
+# cross-process lock so that replicas seeing the same new export parse it once.
+# Published ledgers hold float64; other dtypes are cast into a private copy. New
+# days are therefore only appended to a float64 `current`, or to the published file
+# of its version when `current` is such a copy.
+def load_export(path=DATA_PATH, dtype="float64", current=None):
+    version = file_digest(path)[:16]
+    if current is not None and current.version == version:
+        return current
+    name = _cache_name(path)
+    cache_file = _cache_path(name, version)
+    ledger = _attach(cache_file)
+    if ledger is None:
+        with exclusive(_lock_path(name)):
+            ledger = _attach(cache_file)
+            if ledger is None:
+                if current is not None and current.values.dtype != np.float64:
+                    current = _attach(_cache_path(name, current.version))
+                delta = read_export_delta(current, path) if current is not None else None
+                if delta is not None:
+                    ledger = current.append(*delta, version=version)
+                else:
+                    ledger = read_export(path)
+                    ledger.version = version
+                ledger = _publish(ledger, name) or ledger
+    return _as_dtype(ledger, dtype)
+
+
+# The export files behind a source: the file itself, every .csv file in a directory,
+# or the matches of a glob pattern, sorted by name.
+def export_paths(source=DATA_PATH):
+    source = str(source)
+    if glob.has_magic(source):
+        paths = [Path(p) for p in glob.glob(source)]
+    elif os.path.isdir(source):
+        paths = [p for p in Path(source).iterdir() if p.suffix.lower() == ".csv"]
+    else:
+        return [Path(source)]
+    if not paths:
+        raise FileNotFoundError(f"No exports found for {source}")
+    return sorted(paths)
+
+
+def _load_export(args):
+    return load_export(*args)
+
+
+# A pool of `workers` processes started from a forkserver (spawn where there is none)
+# rather than forked from the Streamlit server, which would copy its threads and locks.
+def process_pool(workers, initializer=None, initargs=()):
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=initializer, initargs=initargs)
+
+
+# Load several exports in parallel, one process per export up to MAX_WORKERS, from a
+# process_pool(). Each worker goes through load_export(), so files another process
+# has already published are only attached; only the daily matrices come back, and
+# their prefix sums are rebuilt here.
+def read_exports(paths, dtype="float64", workers=None):
+    paths = list(paths)
+    workers = min(len(paths), workers or MAX_WORKERS)
+    if workers <= 1:
+        return [load_export(path, dtype) for path in paths]
+    with process_pool(workers) as pool:
+        return list(pool.map(_load_export, [(path, dtype) for path in paths]))
+
+
+def _stamp(path):
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+_loaded = {}
+_build_locks = {}
+_stats = {"hits": 0, "builds": 0}
+
+
+# Return the cached value for `key` if its stamp is current, otherwise build(current)
+# it. Publishing a new value is a single dict assignment, so a rerun sees either the
+# old ledger or the new one, never a mix. While one session rebuilds, the others
+# keep getting the previous version instead of queueing behind the parse; only the
+# very first load, with nothing to serve yet, waits.
+def _cached(key, stamp, build):
+    entry = _loaded.get(key)
+    if entry is not None and entry[0] == stamp:
+        _stats["hits"] += 1
+        return entry[1]
+
+    build_lock = _build_locks.setdefault(key, threading.Lock())
+    if not build_lock.acquire(blocking=entry is None):
+        return entry[1]
+    try:
+        entry = _loaded.get(key)
+        if entry is None or entry[0] != stamp:
+            entry = (stamp, build(entry[1] if entry is not None else None))
+            _loaded[key] = entry
+            _stats["builds"] += 1
+        return entry[1]
+    finally:
+        build_lock.release()
+
+
+# The ledger of each export in `paths`, keyed by path. Files whose stamp is unchanged
+# reuse their ledger from the previous load; a single changed file is refreshed
+# in-process (so it can take the incremental path), several are parsed in parallel.
+# Ledgers that come back from the worker processes are swapped for the files the
+# workers published. Every ledger is kept for load_ledger() to find.
+def load_exports(paths, dtype="float64"):
+    parts = {}
+    stale = []
+    for path in paths:
+        entry = _loaded.get((path, dtype))
+        if entry is not None and entry[0] == _stamp(path):
+            parts[path] = entry[1]
+        else:
+            stale.append(path)
+    if len(stale) == 1:
+        path = stale[0]
+        parts[path] = _cached((path, dtype), _stamp(path), lambda current: load_export(path, dtype, current))
+    elif stale:
+        for path, ledger in zip(stale, read_exports(stale, dtype)):
+            ledger = _attach(_cache_path(_cache_name(path), ledger.version)) or ledger
+            _loaded[(path, dtype)] = (_stamp(path), _as_dtype(ledger, dtype))
+            parts[path] = _loaded[(path, dtype)][1]
+    return parts
+
+
+# Load the exports `paths` of `source` as one ledger (see load_exports). The merged
+# ledger is published too, under a name derived from the source rather than the
+# list of exports, so a new export dropped into a directory replaces the previous
+# merge's file instead of adding one.
+def _load_merged(source, paths, dtype):
+    parts = load_exports(paths, dtype)
+    ledgers = [parts[path] for path in paths]
+    version = hashlib.sha256(" ".join(l.version or "" for l in ledgers).encode()).hexdigest()[:16]
+    name = _cache_name(source, "merged")
+    merged = _attach(_cache_path(name, version))
+    if merged is None:
+        merged = Ledger.merge(ledgers, version)
+        merged = _publish(merged, name) or merged
+    return _as_dtype(merged, dtype)
+
+
+# Shared entry point for every page. `source` is an export, a directory of exports or
+# a glob; several exports are merged into one time-ordered ledger. The result is kept
+# once per process (per dtype) and handed out by reference, so callers must treat it
+# as read-only. The stat() checks are cheap enough for every rerun and pick up a new
+# or re-exported file without a restart. A merged ledger is kept per source, and the
+# list of exports is part of its stamp, so a changed list replaces it.
+def load_ledger(source=DATA_PATH, dtype="float64"):
+    with stage("load"):
+        paths = export_paths(source)
+        if len(paths) == 1:
+            path = paths[0]
+            return _cached((path, dtype), _stamp(path), lambda current: load_export(path, dtype, current))
+        stamp = tuple((path, _stamp(path)) for path in paths)
+        key = ("merged", str(Path(source).resolve()), dtype)
+        return _cached(key, stamp, lambda current: _load_merged(source, paths, dtype))
+
+
+# How often load_ledger() found its ledger current in memory versus had to build it.
+# Counts are process-wide and approximate under concurrent sessions.
+def load_stats():
+    lookups = _stats["hits"] + _stats["builds"]
+    return {**_stats, "hit_rate": _stats["hits"] / lookups if lookups else 0.0}
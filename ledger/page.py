@@ -0,0 +1,273 @@
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from ledger.anomaly import anomaly_scores
+from ledger.charts import cached_line_chart
+from ledger.compare import COMPARISONS, comparison_range, signed_money
+from ledger.cube import GRANULARITIES
+from ledger.forecast import forecast_for
+from ledger import refresh
+from ledger.perf import begin, finish, fragment, stage
+from ledger.spec import evaluate, evaluate_entities
+from ledger.sql import EXAMPLE, MAX_ROW_LIMIT, ROW_LIMIT, SCHEMA, run_query
+
+
+# Draw a dashboard page from its PageSpec: title, the shared date range and
+# granularity sidebar, a row of metric tiles and one bordered container per chart.
+# All the numbers come from one evaluate() call per rerun.
+def render(spec):
+    st.set_page_config(page_title="Sierra Mining and Crushing Dashboard", layout="wide", page_icon="⛏️")
+
+    # Time this rerun's stages for the perf log and the sidebar panel, see ledger/perf.py.
+    begin(spec.name)
+    st.title(spec.title)
+
+    # The shared ledger of the chosen entity, from the version the background refresher
+    # last swapped in, see ledger/refresh.py and ledger/entities.py.
+    entities, ledger = entity_ledger()
+
+    st.sidebar.header("Filter Date Range")
+    start_date = st.sidebar.date_input("Start Date", ledger.start)
+    end_date = st.sidebar.date_input("End Date", ledger.end)
+    period = st.sidebar.selectbox("Granularity", list(GRANULARITIES), index=1)
+    compare = st.sidebar.selectbox("Compare with", ["Nothing", *COMPARISONS])
+    overlay = compare != "Nothing" and st.sidebar.checkbox("Show comparison on charts")
+    show_forecast = st.sidebar.checkbox("Show forecast to year end")
+
+    # Figures are cached across sessions for this ledger version and date range, see ledger/charts.py.
+    view = (ledger.version, start_date, end_date)
+    totals, period_data = evaluate(spec, ledger, start_date, end_date, period)
+
+    # The comparison range is evaluated like the current one: prefix-sum differences
+    # and a rollup-cube slice, through the same shared results cache. It is only shown
+    # when the ledger covers all of it, so a partial year never reads as a drop.
+    prior = None
+    if compare != "Nothing":
+        prior_start, prior_end, offset = comparison_range(start_date, end_date, COMPARISONS[compare])
+        if prior_start >= ledger.start:
+            prior_totals, prior_data = evaluate(spec, ledger, prior_start, prior_end, period)
+            prior = (compare, prior_totals, prior_data, offset)
+            st.caption(f"Compared with {prior_start:%b %d, %Y} to {prior_end:%b %d, %Y}.")
+        else:
+            st.caption(f"{compare} starts before the first day of data ({ledger.start:%b %d, %Y}); "
+                       "nothing to compare with.")
+
+    if spec.metrics:
+        with st.container(horizontal=True):
+            for metric in spec.metrics:
+                delta = None
+                if prior is not None:
+                    delta = signed_money(totals[metric.account] - prior[1][metric.account])
+                st.metric(metric.label, f"${totals[metric.account]:,.2f}", delta=delta,
+                          delta_color="inverse" if metric.cost else "normal", border=True)
+
+    # The consolidated view of several entities breaks the metrics down by entity, from
+    # one pass over all of them through the shared results cache.
+    if spec.metrics and len(entities) > 1 and ledger is entities.consolidated:
+        by_entity = evaluate_entities(spec, entities, start_date, end_date)
+        money = st.column_config.NumberColumn(format="dollar")
+        st.dataframe(by_entity, width="stretch", column_config={label: money for label in by_entity.columns})
+
+    # Models are fitted once per ledger version, see ledger/forecast.py. Projected
+    # segments only continue charts that run to the last day of data.
+    forecast = None
+    if show_forecast:
+        forecast = forecast_for(ledger)
+        if not forecast.fitted:
+            st.caption(f"Too little history to forecast: {forecast.weeks} complete weeks.")
+            forecast = None
+        else:
+            projection_table(spec, ledger, forecast)
+            if end_date < ledger.end:
+                st.caption(f"Charts show the forecast when the range runs to {ledger.end:%b %d, %Y}.")
+                forecast = None
+
+    if spec.anomalies is not None:
+        anomaly_table(spec.anomalies, ledger, view, start_date, end_date)
+
+    for chart in spec.charts:
+        if spec.subheaders:
+            st.subheader(f"{GRANULARITIES[period]} {chart.title}")
+        with st.container(border=True):
+            if chart.select:
+                selectable_chart(chart, view, period_data, period, chart.names(ledger.tree))
+            else:
+                series = chart.y(ledger.tree)
+                comparison = None
+                if overlay and prior is not None and isinstance(series, str):
+                    name, _, prior_data, offset = prior
+                    comparison = (name, prior_data[period] + offset, prior_data[series])
+                projection = None
+                if forecast is not None and isinstance(series, str):
+                    column = ledger.index[spec.columns(ledger.tree)[series]]
+                    projection = forecast.segment(period_data, period, series, column)
+                plot(chart, view, period_data, period, series, comparison, projection)
+
+    # Log this rerun's timings and draw the performance toggle (and panel, when on).
+    finish(ledger)
+
+
+def figure(chart, view, period_data, period, series, comparison=None, projection=None):
+    return cached_line_chart(view, period_data, x=period, y=series, title=f"{GRANULARITIES[period]} {chart.title}",
+                             markers=True, overlay=comparison, projection=projection)
+
+
+# The entity set and the ledger of the entity picked in the sidebar, the consolidation
+# by default. With a single entity there is nothing to pick.
+def entity_ledger():
+    entities = refresh.current()
+    if refresh.REFRESH_SECONDS > 0:
+        with st.sidebar:
+            update_notice(entities.version)
+    if len(entities) == 1:
+        return entities, entities.consolidated
+    return entities, entities[st.sidebar.selectbox("Entity", entities.names)]
+
+
+# A notice that newer data has been swapped in than this rerun drew (`version`), with
+# a button to redraw the page with it. A fragment that reruns on its own every
+# refresh interval, so an open page learns of the update without reloading or
+# waiting for anything. Only drawn while the background refresher runs.
+@st.fragment(run_every=refresh.REFRESH_SECONDS or None)
+def update_notice(version):
+    with fragment("update_notice"):
+        entities = refresh.current()
+        if entities.version == version:
+            return
+        updated = refresh.updated_at()
+        when = f" at {time.strftime('%H:%M', time.localtime(updated))}" if updated else ""
+        st.info(f"Data updated{when}.", icon="🔄")
+        if st.button("Show new data"):
+            st.rerun()
+
+
+# Draw one chart. `comparison` is an optional (name, x, y) overlay trace and
+# `projection` an optional (x, y) forecast segment.
+def plot(chart, view, period_data, period, series, comparison=None, projection=None):
+    fig = figure(chart, view, period_data, period, series, comparison, projection)
+    with stage("serialize"):
+        return st.plotly_chart(fig, use_container_width=True)
+
+
+# The ranked anomaly table and a chart of one flagged account against its baseline.
+# A fragment, so picking another account redraws only this block.
+@st.fragment
+def anomaly_table(anomalies, ledger, view, start_date, end_date):
+    with fragment("anomaly_table", ledger):
+        scores = anomaly_scores(ledger)
+        columns = np.concatenate([ledger.tree.leaves(group) for group in anomalies.groups])
+        ranking = scores.top(ledger.tree, columns, start_date, end_date, anomalies.top, anomalies.threshold)
+
+        st.subheader(anomalies.title)
+        if ranking.empty:
+            st.info(f"No account rose {anomalies.threshold:g} spreads above its {scores.window}-week "
+                    "baseline in this range.")
+            return
+        money = st.column_config.NumberColumn(format="dollar")
+        st.dataframe(ranking.drop(columns="Path"), hide_index=True, width="stretch",
+                     column_config={"Amount": money, "Baseline": money,
+                                    "Week": st.column_config.DateColumn(format="MMM D, YYYY")})
+
+        paths = dict(zip(ranking["Unit"] + " (" + ranking["Group"] + ")", ranking["Path"]))
+        label = st.selectbox("Show account", list(paths))
+        history = scores.history(ledger.index[paths[label]], start_date, end_date)
+        fig = cached_line_chart((*view, "anomaly"), history, x="Week", y=["Amount", "Baseline"],
+                                title=f"Weekly {label} Against Its Baseline", markers=True)
+        with stage("serialize"):
+            st.plotly_chart(fig, use_container_width=True)
+
+
+# Actual, projected remaining and projected total for the fiscal year of the page's
+# metrics and single-series charts. When the data ends with a fiscal year there is
+# nothing of the next one to date, so the table is the next year's projection alone.
+def projection_table(spec, ledger, forecast):
+    columns = spec.columns(ledger.tree)
+    names = {metric.label: metric.account for metric in spec.metrics}
+    for chart in spec.charts:
+        series = chart.y(ledger.tree)
+        if isinstance(series, str) and series not in names.values():
+            names[series] = series
+    accounts = {label: columns[name] for label, name in names.items()}
+    remainder = np.round(forecast.remainder(ledger.columns(accounts)), 2)
+    model = "trend and yearly cycle" if forecast.harmonics else "trend"
+    money = st.column_config.NumberColumn(format="dollar")
+
+    year_start, year_end = pd.Timestamp(forecast.year_start), pd.Timestamp(forecast.year_end)
+    if forecast.next_year:
+        with st.expander(f"Projected Next Fiscal Year ({year_start:%b %d, %Y} to {year_end:%b %d, %Y})",
+                         expanded=True):
+            st.caption(f"The data ends with the fiscal year on {ledger.end:%b %d, %Y}; the next year is "
+                       f"projected from a weekly {model} fitted on the last {forecast.weeks} complete weeks.")
+            st.dataframe(
+                pd.DataFrame({"Account": list(accounts), "Projected Year Total": remainder}),
+                hide_index=True, width="stretch", column_config={"Projected Year Total": money},
+            )
+        return
+
+    to_date = ledger.totals(accounts, max(forecast.year_start, ledger.dates[0]), ledger.end).to_numpy()
+    with st.expander(f"Projected Year End ({year_end:%b %d, %Y})", expanded=True):
+        st.caption(f"Actuals through {ledger.end:%b %d, %Y}; the rest of the year from a weekly {model} "
+                   f"fitted on the last {forecast.weeks} complete weeks.")
+        st.dataframe(
+            pd.DataFrame({"Account": list(accounts), "To Date": to_date, "Projected Rest of Year": remainder,
+                          "Projected Year End": np.round(to_date + remainder, 2)}),
+            hide_index=True, width="stretch",
+            column_config={"To Date": money, "Projected Rest of Year": money, "Projected Year End": money},
+        )
+
+
+# The SQL page: ad-hoc queries over the tidy ledger tables (see ledger/sql.py), with
+# results shared across sessions through the query cache and cut to a row limit.
+def query_page():
+    st.set_page_config(page_title="Sierra Mining and Crushing Dashboard", layout="wide", page_icon="⛏️")
+
+    begin("SQL")
+    st.title("Query the Ledger")
+    _, ledger = entity_ledger()
+    with st.expander("Tables"):
+        st.markdown(SCHEMA)
+
+    with st.form("query"):
+        sql = st.text_area("SQL", EXAMPLE, height=260)
+        limit = st.number_input("Row limit", min_value=1, max_value=MAX_ROW_LIMIT, value=ROW_LIMIT, step=100)
+        st.form_submit_button("Run")
+
+    try:
+        result, truncated = run_query(ledger, sql, limit)
+    except ValueError as error:
+        st.error(str(error))
+    else:
+        st.caption(f"{len(result):,} rows{f', cut at the row limit of {limit:,}' if truncated else ''}.")
+        st.dataframe(result, hide_index=True, width="stretch")
+
+    finish(ledger)
+
+
+# Put the page's default views (the whole ledger at each of `granularities`, every
+# selectable series selected) into the results and figure caches, under the keys a
+# first visit looks up, without drawing anything.
+def warm(spec, granularities=("Week",)):
+    ledger = refresh.current().consolidated
+    view = (ledger.version, ledger.start, ledger.end)
+    forecast_for(ledger)
+    if spec.anomalies is not None:
+        anomaly_scores(ledger)
+    for period in granularities:
+        _, period_data = evaluate(spec, ledger, ledger.start, ledger.end, period)
+        for chart in spec.charts:
+            series = chart.names(ledger.tree) if chart.select else chart.y(ledger.tree)
+            figure(chart, view, period_data, period, series)
+
+
+# A chart whose lines are picked in a multiselect. It is a fragment: changing the
+# selection reruns only this function, with the period_data it was first called
+# with, and resends only its chart. The loader, the metrics and the other charts are
+# left alone.
+@st.fragment
+def selectable_chart(chart, view, period_data, period, options):
+    with fragment("selectable_chart"):
+        selected = st.multiselect(chart.select, options, default=options)
+        plot(chart, view, period_data, period, selected)
@@ -0,0 +1,141 @@
+from ledger.spec import Anomalies, Chart, Metric, PageSpec
+
+
+# The company-wide view: the four headline totals and their trend over time.
+HOME = PageSpec(
+    name="Home",
+    title="⛏️ Sierra Mining and Crushing - Dashboard",
+    metrics=[
+        Metric("Total Income"),
+        Metric("Costs of Goods and Services", "Total COGS", cost=True),
+        Metric("Total Expenses", "Total Expense", cost=True),
+        Metric("Net Income"),
+    ],
+    charts=[
+        Chart("Total Income Over Time", "Total Income"),
+        Chart("Total Cost of Goods and Services Over Time", "Total COGS"),
+        Chart("Total Expenses Over Time", "Total Expense"),
+        Chart("Net Income Over Time", "Net Income"),
+    ],
+)
+
+
+# Total Income and the accounts directly under Income in the account tree: Discounts
+# Given, Income, Income-Dump Fees, Income-Hauling, Income-Materials, Interest Income
+# and Total Sierra Waste and Recycling.
+INCOME = PageSpec(
+    name="Income",
+    title="Income Breakdown",
+    section="Income",
+    aliases={"Total Income": "Income"},
+    subheaders=True,
+    metrics=[
+        Metric("Total Income"),
+        Metric("Discounts Given"),
+        Metric("Income"),
+        Metric("Income-Dump Fees"),
+        Metric("Income-Hauling"),
+        Metric("Income Materials", "Income-Materials"),
+        Metric("Interest Income"),
+        Metric("Total Sierra Waste and Recycling"),
+    ],
+    charts=[
+        Chart("Total Income Over Time", "Total Income"),
+        Chart("Discounts Given Over Time", "Discounts Given"),
+        Chart("Income Components Over Time", ["Income-Dump Fees", "Income-Hauling", "Income-Materials",
+                                              "Interest Income", "Total Sierra Waste and Recycling"]),
+    ],
+)
+
+
+# The COGS section of the account tree, from "Cost of Goods Sold" down to "Total COGS".
+# The component charts plot the children of their group and let the reader pick them.
+COGS = PageSpec(
+    name="COGS",
+    title="Income Breakdown",
+    section="COGS",
+    costs=True,
+    metrics=[
+        Metric("Total COGS"),
+        Metric("Total Vehicle Repairs & Maintenance"),
+        Metric("Direct Labor"),
+        Metric("Equipment Rental"),
+        Metric("Fuel"),
+        Metric("Landfill Fees"),
+        Metric("Material Testing"),
+        Metric("Total Materials"),
+        Metric("Subcontractor"),
+        Metric("Subcontractor-SMC"),
+    ],
+    charts=[
+        Chart("Total Cost of Goods and Services Over Time", "Total COGS"),
+        Chart("Direct Labor Over Time", "Direct Labor"),
+        Chart("Equipment Rental Over Time", "Equipment Rental"),
+        Chart("Equipment Repairs & Maintenance Over Time", "Total Equipment Repairs & Maintenance"),
+        Chart("Equipment Maintenance Components Over Time", children="COGS/Equipment Repairs & Maintenance",
+              select="Select Maintenance Components to Plot"),
+        Chart("Material Components Over Time", children="COGS/Materials",
+              select="Select Material Components to Plot"),
+        Chart("Vehicle Repairs and Maintenance Components Over Time", children="COGS/Vehicle Repairs & Maintenance",
+              select="Select Vehicle Repair Components to Plot"),
+        Chart("Fuel Over Time", "Fuel"),
+    ],
+)
+
+
+# The Expense section of the account tree (overhead below the COGS line), with the
+# larger expense groups broken down into their accounts.
+EXPENSES = PageSpec(
+    name="Expenses",
+    title="Expense Breakdown",
+    section="Expense",
+    costs=True,
+    metrics=[
+        Metric("Total Expense"),
+        Metric("Payroll Expenses", "Total Payroll Expenses"),
+        Metric("Interest Expense", "Total Interest Expense"),
+        Metric("Insurance", "Total Insurance"),
+        Metric("Taxes", "Total Taxes"),
+        Metric("Professional Fees", "Total Professional Fees"),
+        Metric("Tires"),
+        Metric("Contributions"),
+    ],
+    charts=[
+        Chart("Total Expenses Over Time", "Total Expense"),
+        Chart("Expense Categories Over Time", children="Expense", select="Select Expense Categories to Plot"),
+        Chart("Payroll Expense Components Over Time", children="Expense/Payroll Expenses",
+              select="Select Payroll Components to Plot"),
+        Chart("Interest Expense Components Over Time", children="Expense/Interest Expense",
+              select="Select Interest Components to Plot"),
+        Chart("Insurance Components Over Time", children="Expense/Insurance",
+              select="Select Insurance Components to Plot"),
+        Chart("Tax Components Over Time", children="Expense/Taxes", select="Select Tax Components to Plot"),
+    ],
+)
+
+
+# Equipment and vehicle repair accounts whose weekly costs spike above their own
+# recent level, ranked, so a failing unit stands out without reading dozens of lines.
+REPAIRS = PageSpec(
+    name="Repair Anomalies",
+    title="Repair Cost Anomalies",
+    section="COGS",
+    costs=True,
+    metrics=[
+        Metric("Total Equipment Repairs & Maintenance"),
+        Metric("Total Vehicle Repairs & Maintenance"),
+    ],
+    anomalies=Anomalies(
+        ["COGS/Equipment Repairs & Maintenance", "COGS/Vehicle Repairs & Maintenance"],
+        title="Units With Repair Cost Spikes",
+    ),
+    charts=[
+        Chart("Equipment Repairs & Maintenance Over Time", "Total Equipment Repairs & Maintenance"),
+        Chart("Vehicle Repairs & Maintenance Over Time", "Total Vehicle Repairs & Maintenance"),
+    ],
+)
+
+
+# Every page with a spec, in sidebar order, for the entry points that run them
+# without a browser: warm_up() and the reports.
+PAGES = [HOME, INCOME, COGS, EXPENSES, REPAIRS]
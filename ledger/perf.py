@@ -0,0 +1,219 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+
+# Per-rerun timings of the steps a page spends its time in:
+#
+#   load          load_ledger(): stat checks, and the parse or refresh when the export changed
+#   date_range    locating the selected dates (binary searches over the sorted dates)
+#   aggregate     per-period sums for the charts (RollupCube.slice)
+#   figure_build  building figures that are not in the figure cache
+#   serialize     st.plotly_chart, which turns the figure into JSON for the browser
+#
+# A page calls begin() first and finish() last, and a fragment, which Streamlit can
+# rerun on its own, runs its body in `with fragment(name):`. In between, library
+# code wraps each step in `with stage(name):`. The rerun being timed is kept per
+# thread (Streamlit runs each session's script in its own thread), so library code
+# never needs it passed in. When neither the log nor the panel is on, begin() records nothing and
+# stage() hands back one shared no-op context: a thread-local lookup per step.
+#
+# Reruns are also charged the bytes of the cached results and figures they use (see
+# charge()), which is the memory figure reported per session.
+#
+# Each finished rerun is logged as one JSON line on the "ledger.perf" logger at INFO.
+# Set LEDGER_PERF_LOG to a file path (or "-" for stderr) to write those lines
+# without configuring logging yourself.
+logger = logging.getLogger("ledger.perf")
+
+PERF_LOG = os.environ.get("LEDGER_PERF_LOG")
+if PERF_LOG:
+    _handler = logging.StreamHandler() if PERF_LOG == "-" else logging.FileHandler(PERF_LOG)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# Session state key of the sidebar toggle that shows the performance panel.
+PANEL_KEY = "performance_panel"
+
+# Session state keys of the page last drawn and of the last fragment rerun's record.
+PAGE_KEY = "performance_page"
+FRAGMENT_KEY = "performance_fragment"
+
+_NOT_TIMED = nullcontext()
+_current = threading.local()
+
+
+class _Stage:
+    __slots__ = ("rerun", "name", "started")
+
+    def __init__(self, rerun, name):
+        self.rerun = rerun
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.rerun.add(self.name, time.perf_counter() - self.started)
+
+
+# The timings of one rerun of one page. A stage entered several times (one
+# figure_build per chart, say) accumulates its seconds and counts its calls.
+class Rerun:
+    def __init__(self, page):
+        self.page = page
+        self.started = time.perf_counter()
+        self.seconds = {}
+        self.calls = {}
+        self.nbytes = {}
+        self.total = None
+
+    def add(self, name, seconds):
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def charge(self, name, nbytes):
+        self.nbytes[name] = self.nbytes.get(name, 0) + nbytes
+
+    # Time spent outside the named stages: widgets, metrics, layout.
+    @property
+    def other(self):
+        return max(0.0, (self.total or 0.0) - sum(self.seconds.values()))
+
+    def record(self, **extra):
+        return {
+            "page": self.page,
+            "time": time.time(),
+            "total_ms": round(self.total * 1000, 3),
+            "stages_ms": {name: round(s * 1000, 3) for name, s in self.seconds.items()},
+            "calls": self.calls,
+            "other_ms": round(self.other * 1000, 3),
+            "session_bytes": self.nbytes,
+            **extra,
+        }
+
+
+def _panel_on():
+    import streamlit as st
+
+    return bool(st.session_state.get(PANEL_KEY, False))
+
+
+# Start timing a rerun of `page` on this thread. Returns the Rerun, or None when
+# neither the log nor the panel wants one.
+def begin(page):
+    rerun = Rerun(page) if logger.isEnabledFor(logging.INFO) or _panel_on() else None
+    _current.rerun = rerun
+    if rerun is not None:
+        import streamlit as st
+
+        st.session_state[PAGE_KEY] = page
+    return rerun
+
+
+def stage(name):
+    rerun = getattr(_current, "rerun", None)
+    return rerun.stage(name) if rerun is not None else _NOT_TIMED
+
+
+# Count `nbytes` of derived data (results, figures) against the current rerun. What
+# a rerun is charged is what its session holds on to until its next rerun; the
+# objects themselves live once in the shared caches, so this sizes a session's
+# working set rather than memory it holds alone.
+def charge(name, nbytes):
+    rerun = getattr(_current, "rerun", None)
+    if rerun is not None:
+        rerun.charge(name, nbytes)
+
+
+# End the rerun started by begin(): log it, then draw the sidebar toggle and, when it
+# is on, the panel. `ledger` is the ledger the page showed, for its memory size.
+# Cache statistics are process-wide, so they cover every session.
+def finish(ledger=None):
+    import streamlit as st
+
+    rerun = getattr(_current, "rerun", None)
+    _current.rerun = None
+    if rerun is not None:
+        record = _log(rerun, ledger)
+
+    st.sidebar.toggle("Performance panel", key=PANEL_KEY)
+    if rerun is not None and st.session_state.get(PANEL_KEY):
+        _panel(record, st.session_state.get(FRAGMENT_KEY))
+
+
+# Time a fragment's body. When the whole page reruns, the fragment runs inside the
+# page's timed rerun and adds its stages to it. When Streamlit reruns the fragment
+# alone (a multiselect change, a run_every tick), that is a rerun of its own: it is
+# logged with the page it belongs to and `fragment` set, and kept for the panel,
+# which shows it on the next full rerun (a fragment cannot draw in the sidebar).
+@contextmanager
+def fragment(name, ledger=None):
+    if getattr(_current, "rerun", None) is not None:
+        yield
+        return
+    import streamlit as st
+
+    rerun = begin(st.session_state.get(PAGE_KEY, name))
+    try:
+        yield
+    finally:
+        _current.rerun = None
+        if rerun is not None:
+            st.session_state[FRAGMENT_KEY] = _log(rerun, ledger, fragment=name)
+
+
+# Close `rerun`, log it and return its record.
+def _log(rerun, ledger=None, **extra):
+    from ledger.charts import figure_cache
+    from ledger.loader import load_stats
+    from ledger.spec import results_cache
+
+    rerun.total = time.perf_counter() - rerun.started
+    record = rerun.record(
+        **extra,
+        version=getattr(ledger, "version", None),
+        dataset_mb=round(ledger.nbytes / 2**20, 3) if ledger is not None else None,
+        figure_cache=figure_cache.stats(),
+        results_cache=results_cache.stats(),
+        ledger_cache=load_stats(),
+    )
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps(record, default=str))
+    return record
+
+
+def _panel(record, fragment_record=None):
+    import streamlit as st
+
+    with st.sidebar.expander("Performance", expanded=True):
+        st.caption(f"This rerun of {record['page']}: {record['total_ms']:.1f} ms")
+        if fragment_record is not None:
+            st.caption(f"Last fragment rerun ({fragment_record['fragment']}): {fragment_record['total_ms']:.1f} ms")
+        rows = [{"stage": name, "ms": ms, "calls": record["calls"][name]} for name, ms in record["stages_ms"].items()]
+        rows.append({"stage": "other", "ms": record["other_ms"], "calls": None})
+        st.dataframe(rows, hide_index=True, width="stretch")
+
+        for label, cache in (("Figure cache", record["figure_cache"]), ("Results cache", record["results_cache"])):
+            st.caption(
+                f"{label}: {cache['hit_rate']:.0%} hits, {cache['entries']} entries, "
+                f"{cache['bytes'] / 2**20:.1f} of {cache['max_bytes'] / 2**20:.0f} MB"
+            )
+        ledgers = record["ledger_cache"]
+        st.caption(f"Ledger cache: {ledgers['hit_rate']:.0%} hits, {ledgers['builds']} builds")
+        session = record["session_bytes"]
+        st.caption(
+            f"This session: {sum(session.values()) / 2**20:.2f} MB "
+            f"({', '.join(f'{name} {n / 2**20:.2f}' for name, n in session.items()) or 'nothing'}), "
+            "held once in the shared caches"
+        )
+        if record["dataset_mb"] is not None:
+            st.caption(f"Dataset in memory: {record['dataset_mb']:.1f} MB")
@@ -0,0 +1,106 @@
+import logging
+import os
+import threading
+import time
+
+from ledger.entities import entity_sources, load_entities
+from ledger.loader import export_paths
+
+
+logger = logging.getLogger("ledger.refresh")
+
+# Seconds between checks of the exports for changes. 0 turns the background refresher
+# off, and every rerun checks (and, after a change, rebuilds) inline as before.
+REFRESH_SECONDS = float(os.environ.get("LEDGER_REFRESH_SECONDS", 10))
+
+
+def _stat(path):
+    stat = path.stat()
+    return str(path), stat.st_mtime_ns, stat.st_size
+
+
+# The stamps (mtime and size) of every export behind every entity. A new file dropped
+# into an export directory, a new entity directory or a rewritten export changes it.
+def sources_stamp():
+    return tuple(
+        (name, tuple(_stat(path) for path in export_paths(source)))
+        for name, source in entity_sources().items()
+    )
+
+
+# Watches the exports from a daemon thread and builds each new dataset version there,
+# off the request path.
+#
+# Every REFRESH_SECONDS it compares the exports' stamps with those of the current
+# version. A change is only acted on once the stamps have held still for a whole
+# interval, so an export still being copied into the drop folder is not read half
+# written. The new version is then loaded (parsed and published, see
+# ledger/loader.py) and consolidated in this thread, and swapped in by replacing one
+# reference: a rerun that has already taken the old EntitySet keeps using it, and
+# the next one gets the new one, complete.
+class Refresher(threading.Thread):
+    def __init__(self, interval=REFRESH_SECONDS):
+        super().__init__(name="ledger-refresher", daemon=True)
+        self.interval = interval
+        self.entities = None
+        self.stamp = None
+        self.updated_at = None
+        self._stopped = threading.Event()
+
+    def load(self):
+        stamp = sources_stamp()
+        self.entities = load_entities()
+        self.stamp = stamp
+        self.updated_at = time.time()
+
+    def run(self):
+        pending = None
+        while not self._stopped.wait(self.interval):
+            try:
+                stamp = sources_stamp()
+                if stamp == self.stamp:
+                    pending = None
+                elif stamp != pending:
+                    pending = stamp
+                else:
+                    started = time.perf_counter()
+                    version = self.entities.version
+                    self.load()
+                    pending = None
+                    logger.info("refreshed %s -> %s in %.2fs", version, self.entities.version,
+                                time.perf_counter() - started)
+            except Exception:
+                logger.exception("refresh failed; still serving %s", self.entities.version)
+
+    def stop(self):
+        self._stopped.set()
+
+
+_refresher = None
+_lock = threading.Lock()
+
+
+# The current EntitySet. The first call loads it (the only load a rerun waits for)
+# and starts the refresher; later calls return whatever version the refresher last
+# swapped in, without touching the exports. With REFRESH_SECONDS at 0 this is
+# load_entities().
+def current():
+    global _refresher
+    if REFRESH_SECONDS <= 0:
+        return load_entities()
+    refresher = _refresher
+    if refresher is None:
+        with _lock:
+            if _refresher is None:
+                refresher = Refresher()
+                refresher.load()
+                refresher.start()
+                _refresher = refresher
+            refresher = _refresher
+    return refresher.entities
+
+
+# When the current version was swapped in (time.time()), or None before the first load
+# and without the refresher.
+def updated_at():
+    return _refresher.updated_at if _refresher is not None else None
@@ -0,0 +1,127 @@
+import html
+import time
+
+import numpy as np
+import pandas as pd
+
+from ledger.anomaly import anomaly_scores
+from ledger.charts import line_chart
+from ledger.cube import GRANULARITIES
+from ledger.loader import DATA_PATH, MAX_WORKERS, load_ledger, process_pool
+from ledger.pages import PAGES
+from ledger.spec import evaluate
+
+
+_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: -apple-system, "Segoe UI", Roboto, sans-serif; margin: 2rem; color: #262730; }}
+h2 {{ margin-top: 3rem; border-bottom: 1px solid #ddd; padding-bottom: .25rem; }}
+.metrics {{ display: flex; flex-wrap: wrap; gap: 1rem; margin: 1rem 0; }}
+.metric {{ border: 1px solid #ddd; border-radius: .5rem; padding: .75rem 1rem; }}
+.metric .label {{ font-size: .875rem; color: #555; }}
+.metric .value {{ font-size: 1.75rem; }}
+table {{ border-collapse: collapse; margin: 1rem 0; }}
+th, td {{ padding: .25rem .75rem; border-bottom: 1px solid #eee; text-align: right; }}
+th:first-child, td:first-child {{ text-align: left; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+{body}
+</body>
+</html>
+"""
+
+
+# First and last day of every calendar month the ledger has data in, clipped to its
+# first and last days.
+def month_ranges(ledger):
+    months = np.unique(ledger.dates.astype("datetime64[M]"))
+    starts = np.maximum(months.astype("datetime64[D]"), ledger.dates[0])
+    ends = np.minimum((months + 1).astype("datetime64[D]") - 1, ledger.dates[-1])
+    return [(pd.Timestamp(s).date(), pd.Timestamp(e).date()) for s, e in zip(starts, ends)]
+
+
+# One report: each spec's title, metric tiles, anomaly table and charts for the date
+# range, as a standalone HTML document. The numbers come from the same evaluate()
+# call a page rerun makes, and the figures from the same line_chart(). plotly.js is
+# embedded once, with the first chart, so the file opens offline.
+def render_report(specs, ledger, start, end, granularity="Week"):
+    body = []
+    plotly_js = True
+    for spec in specs:
+        totals, period_data = evaluate(spec, ledger, start, end, granularity)
+        body.append(f"<h2>{html.escape(spec.title)}</h2>")
+        if spec.metrics:
+            tiles = "".join(
+                f'<div class="metric"><div class="label">{html.escape(metric.label)}</div>'
+                f'<div class="value">${totals[metric.account]:,.2f}</div></div>'
+                for metric in spec.metrics
+            )
+            body.append(f'<div class="metrics">{tiles}</div>')
+
+        if spec.anomalies is not None:
+            anomalies = spec.anomalies
+            columns = np.concatenate([ledger.tree.leaves(group) for group in anomalies.groups])
+            ranking = anomaly_scores(ledger).top(ledger.tree, columns, start, end, anomalies.top, anomalies.threshold)
+            body.append(f"<h3>{html.escape(anomalies.title)}</h3>")
+            if ranking.empty:
+                body.append("<p>No account rose above its baseline in this range.</p>")
+            else:
+                money = "${:,.2f}".format
+                body.append(ranking.drop(columns="Path").to_html(
+                    index=False, border=0,
+                    formatters={"Week": "{:%b %d, %Y}".format, "Amount": money, "Baseline": money},
+                ))
+
+        for chart in spec.charts:
+            series = chart.names(ledger.tree) if chart.select else chart.y(ledger.tree)
+            fig = line_chart(period_data, x=granularity, y=series,
+                             title=f"{GRANULARITIES[granularity]} {chart.title}", markers=True)
+            body.append(fig.to_html(full_html=False, include_plotlyjs=plotly_js, config={"displaylogo": False}))
+            plotly_js = False
+
+    title = f"Sierra Mining and Crushing, {start:%b %d, %Y} to {end:%b %d, %Y}"
+    return _PAGE.format(title=html.escape(title), body="\n".join(body))
+
+
+# State of a report worker process, set once by _start_worker.
+_worker = {}
+
+
+def _start_worker(source, specs, granularity):
+    _worker.update(source=source, specs=specs, granularity=granularity)
+    load_ledger(source)
+
+
+def _write_report(task):
+    start, end, path = task
+    started = time.perf_counter()
+    ledger = load_ledger(_worker["source"])
+    path.write_text(render_report(_worker["specs"], ledger, start, end, _worker["granularity"]), encoding="utf-8")
+    return path, time.perf_counter() - started
+
+
+# Write one report per (start, end) range into `out_dir`, named after the range, and
+# return (path, seconds) for each.
+#
+# The ledger is loaded (parsed and published, if it has not been) here first; the
+# worker processes then attach the published file, so they all share one
+# memory-mapped copy of the data instead of each parsing the export. Reports are
+# spread over up to `workers` processes from the loader's process_pool().
+def write_reports(ranges, out_dir, specs=None, source=DATA_PATH, granularity="Week", workers=None):
+    specs = PAGES if specs is None else specs
+    load_ledger(source)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tasks = [(start, end, out_dir / f"{start:%Y-%m-%d}_to_{end:%Y-%m-%d}.html") for start, end in ranges]
+
+    workers = min(len(tasks), workers or MAX_WORKERS)
+    if workers <= 1:
+        _start_worker(source, specs, granularity)
+        return [_write_report(task) for task in tasks]
+    with process_pool(workers, _start_worker, (source, specs, granularity)) as pool:
+        return list(pool.map(_write_report, tasks))
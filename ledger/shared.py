@@ -0,0 +1,109 @@
+import json
+import os
+from contextlib import contextmanager
+
+import numpy as np
+
+from ledger.dataset import Ledger
+from ledger.hierarchy import AccountTree
+
+try:
+    import fcntl
+except ImportError:  # Windows: publishing is still atomic, just not deduplicated
+    fcntl = None
+
+
+# A ledger published as an uncompressed Arrow IPC file that every server process
+# memory-maps instead of holding its own copy.
+#
+# The file is one row with three list columns whose value buffers are the raw
+# arrays: `dates` (days since the epoch), `values` (the dates x accounts matrix, row
+# by row) and `cumulative` (its prefix sums), so attach() hands NumPy views straight
+# onto the mapping and the operating system keeps a single copy in its page cache
+# for every replica and page. The account tree and version travel in the schema
+# metadata. Mapped arrays are read-only, which suits a Ledger: it is never modified.
+#
+# Files are named after the export's path and content digest (see loader._cache_path),
+# the digest being the version stamp: a refreshed export gets a new file, processes
+# that see the new version map it, and the old file is unlinked (mappings still open
+# on it stay valid until their ledger is dropped).
+#
+# `ledger` may also be a stack of ledgers on the same dates and accounts, such as an
+# EntitySet's (values entities x days x accounts); attach_arrays() maps it back.
+def publish(ledger, path):
+    import pyarrow as pa
+
+    def flat(array):
+        return pa.ListArray.from_arrays(pa.array([0, array.size], pa.int32()), pa.array(array.reshape(-1)))
+
+    metadata = {
+        "version": ledger.version,
+        "dtype": ledger.values.dtype.str,
+        "shape": list(ledger.values.shape),
+        "paths": ledger.tree.paths,
+        "labels": ledger.tree.labels,
+        "parents": ledger.tree.parents.tolist(),
+        "kinds": ledger.tree.kinds,
+    }
+    table = pa.table({
+        "dates": flat(ledger.dates.view(np.int64)),
+        "values": flat(ledger.values),
+        "cumulative": flat(ledger.cumulative),
+    }).replace_schema_metadata({"ledger": json.dumps(metadata)})
+
+    tmp_path = path.with_suffix(".tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+# Map a published ledger as (dates, values, cumulative, tree, version). Nothing is
+# read up front: pages of the file are faulted in (from the shared page cache) as the
+# arrays are touched.
+def attach_arrays(path):
+    import pyarrow as pa
+
+    table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    metadata = json.loads(table.schema.metadata[b"ledger"])
+    shape = metadata["shape"]
+    days = shape[-2]
+
+    def array(name, dtype, shape):
+        return table.column(name).chunk(0).values.to_numpy(zero_copy_only=True).view(dtype).reshape(shape)
+
+    tree = AccountTree(metadata["paths"], metadata["labels"], metadata["parents"], metadata["kinds"])
+    return (
+        array("dates", np.int64, days).view("datetime64[D]"),
+        array("values", metadata["dtype"], shape),
+        array("cumulative", np.float64, [*shape[:-2], days + 1, shape[-1]]),
+        tree,
+        metadata["version"],
+    )
+
+
+# Map a published ledger as a Ledger.
+def attach(path):
+    dates, values, cumulative, tree, version = attach_arrays(path)
+    return Ledger(dates, tree.paths, values, tree, version, cumulative)
+
+
+# Hold an exclusive lock on `lock_path` across processes, so that when several
+# replicas see a new export at once one of them parses and publishes it and the
+# others wait and then attach. Without fcntl, or when the lock file cannot be
+# created, the lock is a no-op and the replicas race; the atomic rename in publish()
+# keeps that safe.
+@contextmanager
+def exclusive(lock_path):
+    try:
+        lock = open(lock_path, "a") if fcntl is not None else None
+    except OSError:
+        lock = None
+    if lock is None:
+        yield
+        return
+    with lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
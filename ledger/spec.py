@@ -0,0 +1,132 @@
+import os
+
+from ledger.cache import LRUCache
+
+
+# A metric tile: the range total of one account, shown under `label`. `account` is
+# the name the page's data knows it by (see PageSpec) and defaults to the label.
+# `cost` marks amounts where a rise is bad news, so comparison deltas are coloured
+# the other way round; it defaults to the page's `costs`.
+class Metric:
+    def __init__(self, label, account=None, cost=None):
+        self.label = label
+        self.account = account or label
+        self.cost = cost
+
+
+# A line chart of per-period sums. `series` is one account name (a single line) or a
+# list of names; `children` instead plots every direct child of a group path, e.g.
+# "COGS/Materials". With `select` set, the lines can be picked in a multiselect of
+# that label. `title` goes after the granularity adjective, as in "Weekly Fuel
+# Over Time".
+class Chart:
+    def __init__(self, title, series=None, children=None, select=None):
+        self.title = title
+        self.series = series
+        self.children = children
+        self.select = select
+
+    # The data columns the chart plots, in order.
+    def names(self, tree):
+        if self.children is not None:
+            return list(tree.named_children(self.children))
+        return [self.series] if isinstance(self.series, str) else list(self.series)
+
+    # The y argument for the chart: a single name draws one unlabelled line.
+    def y(self, tree):
+        return self.series if isinstance(self.series, str) else self.names(tree)
+
+
+# A ranked table of the accounts below `groups` whose weekly amounts jump furthest
+# above their own recent baseline (see ledger/anomaly.py): the `top` scoring at least
+# `threshold`, with a chart of the picked account against its baseline.
+class Anomalies:
+    def __init__(self, groups, title="Cost Spikes", top=15, threshold=3.0):
+        self.groups = list(groups)
+        self.title = title
+        self.top = top
+        self.threshold = threshold
+
+
+# Everything a dashboard page shows, described rather than coded.
+#
+# Metric and chart names are looked up in the account tree below `section` first
+# ("Direct Labor" on a "COGS" page is COGS/Direct Labor, not the payroll account of
+# the same name), then anywhere in the ledger, and `aliases` maps any other name to
+# an account (e.g. {"Total Income": "Income"}). Charts get an st.subheader with
+# their title when `subheaders` is set. `costs` says whether the page's metrics are
+# costs (see Metric). `anomalies` is an optional Anomalies table, shown between the
+# metrics and the charts.
+class PageSpec:
+    def __init__(self, name, title, metrics=(), charts=(), section=None, aliases=None, subheaders=False,
+                 costs=False, anomalies=None):
+        self.name = name
+        self.title = title
+        self.metrics = list(metrics)
+        self.charts = list(charts)
+        self.section = section
+        self.aliases = dict(aliases or {})
+        self.subheaders = subheaders
+        self.costs = costs
+        self.anomalies = anomalies
+        for metric in self.metrics:
+            if metric.cost is None:
+                metric.cost = costs
+
+    # {name: account} for every column any metric or chart of the page needs, in the
+    # order they first appear.
+    def columns(self, tree):
+        scope = tree.named_descendants(self.section) if self.section else {}
+        names = [metric.account for metric in self.metrics]
+        for chart in self.charts:
+            if chart.children is not None:
+                for name, path in tree.named_children(chart.children).items():
+                    scope.setdefault(name, path)
+            names += chart.names(tree)
+        columns = {}
+        for name in names:
+            columns.setdefault(name, self.aliases.get(name, scope.get(name, name)))
+        return columns
+
+
+# Memory budget of the shared cache of page results, in megabytes.
+RESULTS_CACHE_MB = float(os.environ.get("LEDGER_RESULTS_CACHE_MB", 32))
+
+# (totals, period_data) per ledger version, page columns, row range and granularity,
+# shared by every session (see LRUCache). Dates that select the same rows share an
+# entry.
+results_cache = LRUCache("results", int(RESULTS_CACHE_MB * 1024 * 1024))
+
+
+# The numbers behind one rerun of a page: the range total of every column the page
+# needs and their per-period sums, from a single Ledger.aggregate() call, i.e. one
+# pair of date searches, one prefix-sum difference and one rollup-cube slice over
+# all the columns together rather than one query per metric or chart. Results come
+# from the shared cache when any session has asked for the same view, and must not
+# be modified.
+def evaluate(spec, ledger, start, end, granularity="Week"):
+    columns = spec.columns(ledger.tree)
+    lo, hi = ledger.bounds(start, end)
+    key = (ledger.version or id(ledger), tuple(columns.items()), lo, hi, granularity)
+
+    def build():
+        totals, period_data = ledger.aggregate(columns, start, end, granularity)
+        return (totals, period_data), int(totals.memory_usage() + period_data.memory_usage().sum())
+
+    return results_cache.get_or_build(key, build)
+
+
+# The range totals of the page's metrics for every entity and the consolidation (see
+# EntitySet.totals), a row per entity and a column per metric label, cached like
+# evaluate()'s results.
+def evaluate_entities(spec, entities, start, end):
+    columns = spec.columns(entities.tree)
+    names = {metric.label: columns[metric.account] for metric in spec.metrics}
+    lo, hi = entities.consolidated.bounds(start, end)
+    key = (entities.version, "entities", tuple(names.items()), lo, hi)
+
+    def build():
+        totals = entities.totals(names, start, end)
+        return totals, int(totals.memory_usage(deep=True).sum())
+
+    return results_cache.get_or_build(key, build)
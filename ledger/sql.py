@@ -0,0 +1,148 @@
+import os
+
+import numpy as np
+
+from ledger.cache import LRUCache, VersionCache
+from ledger.perf import stage
+
+
+# Rows a query returns unless the page asks for another limit, and the most it may.
+ROW_LIMIT = 1_000
+MAX_ROW_LIMIT = 100_000
+
+# What the query page shows as the tables' description.
+SCHEMA = """\
+**ledger**: one row per day and account with a non-zero amount (a join of the two tables below).
+
+| column | type | |
+|---|---|---|
+| date | DATE | |
+| account | VARCHAR | path, e.g. `COGS/Equipment Repairs & Maintenance/966H` |
+| label | VARCHAR | e.g. `966H` |
+| parent | VARCHAR | path of the group above it, e.g. `COGS/Equipment Repairs & Maintenance` |
+| kind | VARCHAR | `account`, `total` (a group's Total row) or `summary` (e.g. Net Income) |
+| amount | DOUBLE | |
+
+**cells** (date, account_id, amount) and **accounts** (account_id, path, label, parent, kind) hold the same data.
+Total and summary rows repeat their members' amounts, so sum `kind = 'account'` rows or a single total, not both.
+"""
+
+EXAMPLE = """\
+-- Fuel per week in the weeks hauling income topped $20,000
+WITH weekly AS (
+    SELECT date_trunc('week', date) AS week, label, sum(amount) AS amount
+    FROM ledger
+    WHERE label IN ('Fuel', 'Income-Hauling')
+    GROUP BY ALL
+)
+SELECT week, fuel.amount AS fuel, hauling.amount AS hauling
+FROM weekly fuel JOIN weekly hauling USING (week)
+WHERE fuel.label = 'Fuel' AND hauling.label = 'Income-Hauling' AND hauling.amount > 20000
+ORDER BY week
+"""
+
+
+# An in-process DuckDB database holding one ledger in tidy form.
+#
+# The dense days x accounts matrix is mostly zeros, so only its non-zero cells are
+# stored, as (date, account_id, amount) rows in date order, next to a small table
+# of the account tree. Both are copied into DuckDB's own columnar tables, so a query
+# reads only the columns it names and skips row groups outside its date filter
+# (DuckDB keeps min/max statistics per row group, and the rows are sorted by date);
+# filters on the account columns are pushed into the accounts scan and through the
+# join. Access to files and extensions is switched off once the tables are loaded, so
+# the SQL page can read the ledger and nothing else.
+class LedgerDatabase:
+    def __init__(self, ledger):
+        import duckdb
+        import pyarrow as pa
+
+        self.version = ledger.version
+        tree = ledger.tree
+        rows, columns = np.nonzero(ledger.values)
+        cells = pa.table({
+            "date": pa.array(ledger.dates[rows]),
+            "account_id": pa.array(columns.astype(np.int32)),
+            "amount": pa.array(ledger.values[rows, columns].astype(np.float64)),
+        })
+        accounts = pa.table({
+            "account_id": pa.array(np.arange(len(tree), dtype=np.int32)),
+            "path": tree.paths,
+            "label": tree.labels,
+            "parent": [tree.paths[p] if p >= 0 else None for p in tree.parents],
+            "kind": tree.kinds,
+        })
+
+        self._db = duckdb.connect(":memory:")
+        self._db.register("cells_arrow", cells)
+        self._db.register("accounts_arrow", accounts)
+        self._db.execute("CREATE TABLE cells AS SELECT * FROM cells_arrow")
+        self._db.execute("CREATE TABLE accounts AS SELECT * FROM accounts_arrow")
+        self._db.unregister("cells_arrow")
+        self._db.unregister("accounts_arrow")
+        self._db.execute(
+            "CREATE VIEW ledger AS "
+            "SELECT c.date, a.path AS account, a.label, a.parent, a.kind, c.amount "
+            "FROM cells c JOIN accounts a USING (account_id)"
+        )
+        self._db.execute("SET enable_external_access = false")
+        self._db.execute("SET lock_configuration = true")
+        self.rows = len(cells)
+
+    # Run one SELECT (or WITH ... SELECT) statement and return its first `limit` rows
+    # as a DataFrame, and whether there were more. Anything else, and any error DuckDB
+    # reports, raises ValueError. Each call gets its own cursor, so sessions can query
+    # concurrently.
+    def query(self, sql, limit=ROW_LIMIT):
+        import duckdb
+
+        try:
+            statements = self._db.extract_statements(sql)
+        except duckdb.Error as error:
+            raise ValueError(str(error)) from error
+        if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+            raise ValueError("Enter a single SELECT query.")
+        query = statements[0].query.strip().rstrip(";")
+
+        cursor = self._db.cursor()
+        try:
+            result = cursor.execute(f"SELECT * FROM (\n{query}\n) LIMIT {int(limit) + 1}").df()
+        except duckdb.Error as error:
+            raise ValueError(str(error)) from error
+        finally:
+            cursor.close()
+        return result.iloc[:limit], len(result) > limit
+
+
+# Memory budget of the shared cache of query results, in megabytes.
+QUERY_CACHE_MB = float(os.environ.get("LEDGER_QUERY_CACHE_MB", 16))
+
+# (result, truncated) per ledger version, query text and row limit, shared by every
+# session (see LRUCache). Failed queries are not cached.
+query_cache = LRUCache("queries", int(QUERY_CACHE_MB * 1024 * 1024))
+
+databases = VersionCache("databases")
+
+
+# The database for `ledger`, built once per ledger version for the process.
+def ledger_database(ledger):
+    def build():
+        with stage("sql_load"):
+            return LedgerDatabase(ledger)
+
+    return databases.get_or_build(ledger.version, build)
+
+
+# Run `sql` against `ledger` through the shared cache. Returns (result, truncated).
+# The database is only looked up (or built) for a query that is not cached.
+def run_query(ledger, sql, limit=ROW_LIMIT):
+    sql = sql.strip()
+    limit = min(int(limit), MAX_ROW_LIMIT)
+
+    def build():
+        database = ledger_database(ledger)
+        with stage("query"):
+            result, truncated = database.query(sql, limit)
+        return (result, truncated), int(result.memory_usage(deep=True).sum())
+
+    return query_cache.get_or_build((ledger.version, sql, limit), build)
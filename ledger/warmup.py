@@ -0,0 +1,37 @@
+import time
+
+from ledger import refresh
+from ledger.pages import PAGES
+
+
+# Do the work a first visitor would otherwise wait for, once, when the server starts:
+# import Streamlit and Plotly (and the emoji table set_page_config checks icons
+# against), load (or attach) every entity's ledger with its prefix sums and rollup
+# cube, consolidate them and start the background refresher (see ledger/refresh.py),
+# warm every page's default views into the shared results and figure caches (see
+# ledger.page.warm) and build the SQL page's database. Serializing each new figure
+# for the cache also loads Plotly's lazily imported validators and JSON encoder.
+# Returns the seconds spent per step.
+def warm_up(specs=PAGES, granularities=("Week",)):
+    seconds = {}
+    started = time.perf_counter()
+
+    import plotly.express  # noqa: F401
+    import streamlit  # noqa: F401
+    import streamlit.emojis  # noqa: F401  (loaded by set_page_config's page_icon check)
+
+    from ledger import page
+    from ledger.sql import ledger_database
+
+    seconds["imports"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    ledger = refresh.current().consolidated
+    seconds["ledger"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for spec in specs:
+        page.warm(spec, granularities)
+    ledger_database(ledger)
+    seconds["views"] = time.perf_counter() - started
+    return seconds
@@ -0,0 +1,66 @@
+"""Write the dashboard pages as self-contained HTML reports, without a Streamlit server.
+
+Each date range gets one file with every page's metrics, anomaly tables and charts,
+computed by the same loader and aggregation code the dashboard runs. Reports are
+built in parallel worker processes that share the one published copy of the ledger.
+With no ranges given, there is one report per month of data:
+
+    python report.py
+    python report.py --month 2025-10 --month 2025-11 --pages Home COGS
+    python report.py --range 2025-01-01:2025-06-30 --granularity Month
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from ledger.cube import GRANULARITIES
+from ledger.loader import DATA_PATH, load_ledger
+from ledger.pages import PAGES
+from ledger.report import month_ranges, write_reports
+
+ROOT = Path(__file__).resolve().parent
+
+
+def _month(value):
+    month = pd.Period(value, "M")
+    return month.start_time.date(), month.end_time.date()
+
+
+def _range(value):
+    start, sep, end = value.partition(":")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected START:END, got {value!r}")
+    return pd.Timestamp(start).date(), pd.Timestamp(end).date()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=str(DATA_PATH), help="export, directory of exports or glob")
+    parser.add_argument("--out", type=Path, default=ROOT / "reports", help="directory to write the reports to")
+    parser.add_argument("--month", type=_month, action="append", default=[], metavar="YYYY-MM")
+    parser.add_argument("--range", type=_range, action="append", default=[], metavar="START:END")
+    parser.add_argument("--granularity", choices=list(GRANULARITIES), default="Week")
+    parser.add_argument("--pages", nargs="+", metavar="NAME", help="page names, e.g. Home COGS (default: all)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    specs = PAGES
+    if args.pages:
+        unknown = set(args.pages) - {spec.name for spec in specs}
+        if unknown:
+            parser.error(f"unknown pages {sorted(unknown)}; choose from {[spec.name for spec in specs]}")
+        specs = [spec for spec in specs if spec.name in args.pages]
+    ranges = args.month + args.range or month_ranges(load_ledger(args.source))
+
+    for path, seconds in write_reports(ranges, args.out, specs, args.source, args.granularity, args.workers):
+        print(f"{path} ({seconds:.2f}s)")
+    print(f"{len(ranges)} reports in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
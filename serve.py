@@ -0,0 +1,30 @@
+"""Start the dashboard with its caches warm.
+
+Runs ledger.warmup.warm_up() in this process and then hands over to `streamlit run
+Home.py`, which serves from the same process, so the first visitor after a deploy
+or restart gets the imports, the ledger and the default charts already built.
+Extra arguments are passed to `streamlit run`:
+
+    python serve.py --server.port 8501
+"""
+
+import sys
+from pathlib import Path
+
+from ledger.warmup import warm_up
+
+ROOT = Path(__file__).resolve().parent
+
+
+def main():
+    seconds = warm_up()
+    print("warmed up in " + ", ".join(f"{step} {s:.2f}s" for step, s in seconds.items()), flush=True)
+
+    from streamlit.web import cli
+
+    sys.argv = ["streamlit", "run", str(ROOT / "Home.py"), *sys.argv[1:]]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()
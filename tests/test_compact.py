@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from ledger.compact import CompactLedger
+from ledger.cube import GRANULARITIES
+from ledger.loader import DATA_PATH, read_export
+from ledger.pages import PAGES
+
+
+@pytest.fixture(scope="module")
+def ledger():
+    return read_export(DATA_PATH)
+
+
+@pytest.fixture(scope="module")
+def compact(ledger):
+    return CompactLedger.from_ledger(ledger)
+
+
+def test_dense_matches_values(ledger, compact):
+    assert len(compact) == np.count_nonzero(ledger.values)
+    np.testing.assert_array_equal(compact.dense(), ledger.values)
+    columns = ledger.columns(["Fuel", "Total COGS", "Net Income", "Fuel"])
+    np.testing.assert_array_equal(compact.dense(columns), ledger.values[:, columns])
+    assert compact.dense([]).shape == (len(ledger.dates), 0)
+
+
+def test_write_read_round_trip(ledger, compact, tmp_path):
+    compact = CompactLedger(compact.dates, compact.tree, compact.date_idx, compact.account_ids, compact.amounts, "v1")
+    compact.write(tmp_path / "compact.arrow")
+    read = CompactLedger.read(tmp_path / "compact.arrow")
+    assert read.version == "v1"
+    np.testing.assert_array_equal(read.dates, ledger.dates)
+    assert read.tree.paths == ledger.tree.paths and read.tree.labels == ledger.tree.labels
+    assert read.tree.kinds == ledger.tree.kinds
+    np.testing.assert_array_equal(read.tree.parents, ledger.tree.parents)
+    for name in ("date_idx", "account_ids", "amounts"):
+        assert getattr(read, name).dtype == getattr(compact, name).dtype
+        np.testing.assert_array_equal(getattr(read, name), getattr(compact, name))
+    np.testing.assert_array_equal(read.dense(), ledger.values)
+
+
+# A page run on a narrow ledger of only its own columns gets exactly the totals and
+# period sums the wide ledger gives it.
+@pytest.mark.parametrize("granularity", list(GRANULARITIES))
+def test_narrow_ledgers_aggregate_like_wide(ledger, compact, granularity):
+    start, end = ledger.start, ledger.end
+    for spec in PAGES:
+        columns = spec.columns(ledger.tree)
+        if not columns:
+            continue
+        narrow = compact.ledger(columns)
+        for lo, hi in [(start, end), (start.replace(day=10), end.replace(day=3))]:
+            wide_totals, wide_series = ledger.aggregate(columns, lo, hi, granularity)
+            totals, series = narrow.aggregate(columns, lo, hi, granularity)
+            assert totals.equals(wide_totals), spec.name
+            assert series.equals(wide_series), spec.name
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ledger.cube import GRANULARITIES
+from ledger.dataset import Ledger
+from ledger.entities import CONSOLIDATED, EntitySet
+from ledger.loader import DATA_PATH, read_export
+
+
+# Two entities on overlapping but different days: the shipped export and a second
+# unit with twice its amounts over the middle of the year.
+@pytest.fixture(scope="module")
+def ledgers():
+    ledger = read_export(DATA_PATH)
+    ledger.version = "a"
+    middle = (ledger.dates >= np.datetime64("2025-03-12")) & (ledger.dates < np.datetime64("2025-08-20"))
+    other = Ledger(ledger.dates[middle], ledger.accounts, ledger.values[middle] * 2, ledger.tree, "b")
+    return {"Mine": ledger, "Plant": other}
+
+
+@pytest.fixture(scope="module")
+def entities(ledgers):
+    return EntitySet(ledgers)
+
+
+def _range(ledger, lo, hi):
+    return pd.Timestamp(ledger.dates[lo]).date(), pd.Timestamp(ledger.dates[hi - 1]).date()
+
+
+# Every row of the stacked aggregate equals its entity's own Ledger.totals() and
+# series(), the consolidation's equals the sum of the entities', and each entity's
+# totals equal those of the ledger it was loaded as.
+@pytest.mark.parametrize("granularity", list(GRANULARITIES))
+def test_aggregate_matches_each_ledger(ledgers, entities, granularity):
+    names = {"Income": "Total Income", "COGS": "Total COGS", "Fuel": "Fuel", "Net": "Net Income"}
+    rng = np.random.default_rng(2)
+    n = len(entities.dates)
+    for lo in [0, *rng.integers(0, n, 20)]:
+        hi = lo + 1 + rng.integers(0, n - lo)
+        start, end = _range(entities.consolidated, lo, hi)
+        totals, period_data = entities.aggregate(names, start, end, granularity)
+        assert list(totals.index) == ["Mine", "Plant", CONSOLIDATED]
+        pd.testing.assert_frame_equal(entities.totals(names, start, end), totals)
+        for name in totals.index:
+            expected = entities[name].totals(names, start, end)
+            np.testing.assert_allclose(totals.loc[name].to_numpy(), expected.to_numpy(), rtol=0, atol=0.005)
+            pd.testing.assert_frame_equal(period_data[name], entities[name].series(names, start, end, granularity),
+                                          check_exact=False, atol=0.005, rtol=0)
+        for name, ledger in ledgers.items():
+            expected = ledger.totals(names, start, end)
+            np.testing.assert_allclose(totals.loc[name].to_numpy(), expected.to_numpy(), rtol=0, atol=0.005)
+        np.testing.assert_allclose(totals.loc[CONSOLIDATED], totals.loc["Mine"] + totals.loc["Plant"],
+                                   rtol=0, atol=0.011)
+
+
+def test_single_entity_is_its_ledger(ledgers):
+    single = EntitySet({"Mine": ledgers["Mine"]})
+    assert single.consolidated is ledgers["Mine"] and single.names == ["Mine"]
+    totals = single.totals(["Fuel"], ledgers["Mine"].start, ledgers["Mine"].end)
+    assert list(totals.index) == ["Mine"]
+    assert totals.loc["Mine", "Fuel"] == ledgers["Mine"].totals(["Fuel"], ledgers["Mine"].start, ledgers["Mine"].end)["Fuel"]
@@ -0,0 +1,189 @@
+import csv
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ledger.cube import GRANULARITIES, period_start
+from ledger import loader
+from ledger.anomaly import AnomalyScores
+from ledger.dataset import Ledger
+from ledger.loader import DATA_PATH, read_export, read_export_delta
+
+
+@pytest.fixture(scope="module")
+def ledger():
+    return read_export(DATA_PATH)
+
+
+def _days(ledger, lo, hi):
+    return pd.Timestamp(ledger.dates[lo]).date(), pd.Timestamp(ledger.dates[hi - 1]).date()
+
+
+# Random inclusive day ranges over the ledger as row bounds [lo, hi), plus the edges:
+# single days, the first and last day and the whole ledger.
+def _ranges(ledger, count, seed=0):
+    n = len(ledger.dates)
+    rng = np.random.default_rng(seed)
+    lo = rng.integers(0, n, count)
+    hi = lo + 1 + rng.integers(0, n - lo)
+    return [*zip(lo, hi), (0, 1), (n - 1, n), (0, n)]
+
+
+def test_totals_match_direct_slice_sums(ledger):
+    names = ledger.accounts
+    columns = ledger.columns(names)
+    for lo, hi in _ranges(ledger, 500):
+        totals = ledger.totals(names, *_days(ledger, lo, hi))
+        expected = ledger.values[lo:hi, columns].sum(axis=0, dtype=np.float64)
+        np.testing.assert_allclose(totals.to_numpy(), expected, rtol=0, atol=0.005)
+
+
+def test_totals_of_empty_range_are_zero(ledger):
+    end = pd.Timestamp(ledger.dates[0]).date() - pd.Timedelta(days=1)
+    totals = ledger.totals(["Net Income"], end - pd.Timedelta(days=30), end)
+    assert totals["Net Income"] == 0.0
+
+
+# Every cube slice, edge periods cut by the range included, equals a pandas groupby of
+# the range's days on their period.
+@pytest.mark.parametrize("granularity", list(GRANULARITIES))
+def test_series_match_groupby(ledger, granularity):
+    names = ["Total Income", "Total COGS", "Fuel", "Net Income"]
+    columns = ledger.columns(names)
+    for lo, hi in _ranges(ledger, 150, seed=1):
+        series = ledger.series(names, *_days(ledger, lo, hi), granularity)
+        days = pd.DataFrame(ledger.values[lo:hi, columns], columns=names)
+        expected = days.groupby(period_start(ledger.dates[lo:hi], granularity)).sum()
+        np.testing.assert_array_equal(series[granularity].to_numpy(), expected.index.to_numpy().astype("datetime64[ns]"))
+        np.testing.assert_allclose(series[names].to_numpy(), expected.to_numpy(), rtol=0, atol=0.005)
+
+
+def test_slice_cuts_edge_periods(ledger):
+    cube = ledger.cube
+    column = ledger.index["Total Income"]
+    starts, ends = cube.starts["Month"], cube.ends["Month"]
+    lo, hi = starts[1] + 3, ends[3] - 2
+    periods, sums = cube.slice("Month", lo, hi, [column])
+    assert list(periods) == list(cube.periods["Month"][1:4])
+    assert sums[0, 0] == pytest.approx(ledger.values[lo:ends[1], column].sum())
+    assert sums[1, 0] == pytest.approx(ledger.values[starts[2]:ends[2], column].sum())
+    assert sums[2, 0] == pytest.approx(ledger.values[starts[3]:hi, column].sum())
+    assert sums[0, 0] != pytest.approx(cube.sums["Month"][1, column])
+
+    # A range inside one period cuts it at both ends.
+    lo, hi = starts[2] + 5, starts[2] + 12
+    periods, sums = cube.slice("Month", lo, hi, [column])
+    assert len(periods) == 1
+    assert sums[0, 0] == pytest.approx(ledger.values[lo:hi, column].sum())
+
+    periods, sums = cube.slice("Month", 5, 5, [column])
+    assert len(periods) == 0 and sums.shape == (0, 1)
+
+
+# The tree rebuilt from the blank section headers sums each group's leaf accounts to
+# the export's own "Total ..." row, day by day.
+def test_tree_rollups_match_total_rows(ledger):
+    tree = ledger.tree
+    assert len(tree.groups)
+    for group in tree.groups:
+        leaves = tree.leaves(tree.paths[group])
+        assert len(leaves)
+        np.testing.assert_allclose(ledger.values[:, leaves].sum(axis=1), ledger.values[:, group], rtol=0, atol=0.005)
+    assert tree.parent("COGS/Fuel") == "COGS"
+    with pytest.raises(KeyError):
+        tree.leaves("COGS/Fuel")
+
+
+# The shipped export without its last `days` date columns, as QuickBooks would have
+# exported it that many days earlier: TOTAL is recomputed over the remaining days.
+def _earlier_export(path, days, out):
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    total = rows[0].index("TOTAL")
+    keep = list(range(total - days)) + [total]
+    with open(out, "w", newline="") as f:
+        writer = csv.writer(f)
+        for i, row in enumerate(rows):
+            if i and row[1]:
+                row[total] = f"{sum(float(v) for v in row[1:total - days]):.2f}"
+            writer.writerow([row[c] for c in keep])
+    return out
+
+
+@pytest.mark.parametrize("days", [1, 30])
+def test_appended_days_match_full_parse(ledger, tmp_path, days):
+    earlier = read_export(_earlier_export(DATA_PATH, days, tmp_path / "earlier.csv"))
+    assert len(earlier.dates) == len(ledger.dates) - days
+
+    delta = read_export_delta(earlier, DATA_PATH)
+    assert delta is not None
+    dates, values = delta
+    assert len(dates) == days
+    appended = earlier.append(dates, values, version="appended")
+    assert appended.accounts == ledger.accounts
+    np.testing.assert_array_equal(appended.dates, ledger.dates)
+    np.testing.assert_array_equal(appended.values, ledger.values)
+    np.testing.assert_allclose(appended.cumulative, ledger.cumulative, rtol=0, atol=1e-6)
+    for granularity in GRANULARITIES:
+        np.testing.assert_allclose(appended.cube.sums[granularity], ledger.cube.sums[granularity], rtol=0, atol=1e-6)
+
+
+# Anomaly scores updated from the earlier export's, rescoring only from its last
+# week on, equal the scores of the whole ledger computed from scratch.
+@pytest.mark.parametrize("days", [1, 30])
+def test_updated_anomaly_scores_match_fresh(ledger, tmp_path, days):
+    earlier = read_export(_earlier_export(DATA_PATH, days, tmp_path / "earlier.csv"))
+    earlier.version = "earlier"
+    appended = earlier.append(*read_export_delta(earlier, DATA_PATH), version="appended")
+    previous = AnomalyScores(earlier)
+    assert previous.extended_by(appended)
+
+    updated, fresh = previous.update(appended), AnomalyScores(appended)
+    np.testing.assert_array_equal(updated.weeks, fresh.weeks)
+    for name in ("amounts", "baseline", "spread", "scores"):
+        np.testing.assert_allclose(getattr(updated, name), getattr(fresh, name), rtol=0, atol=1e-6)
+
+
+def test_delta_rejects_changed_history(ledger, tmp_path):
+    earlier = read_export(_earlier_export(DATA_PATH, 10, tmp_path / "earlier.csv"))
+    changed = earlier.values.copy()
+    changed[5, ledger.index["Fuel"]] += 100.0
+    back_dated = Ledger(earlier.dates, earlier.accounts, changed, earlier.tree)
+    assert read_export_delta(back_dated, DATA_PATH) is None
+    assert read_export_delta(ledger, DATA_PATH) is None
+
+
+# A process that reads float32 copies still publishes float64 when the export grows:
+# the new days go onto the published float64 ledger, not the private copy.
+def test_float32_refresh_publishes_float64(ledger, tmp_path, monkeypatch):
+    monkeypatch.setattr(loader, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(loader, "_loaded", {})
+    export = _earlier_export(DATA_PATH, 20, tmp_path / "export.csv")
+    assert loader.load_ledger(export, "float32").values.dtype == np.float32
+    shutil.copy(DATA_PATH, export)
+    os.utime(export, ns=(0, os.stat(export).st_mtime_ns + 10**9))
+    assert loader.load_ledger(export, "float32").values.dtype == np.float32
+
+    loader._loaded.clear()
+    refreshed = loader.load_ledger(export)
+    np.testing.assert_array_equal(refreshed.values, ledger.values)
+
+
+# Where exports overlap, the one that ends later wins the shared days, even when it
+# starts earlier.
+def test_merge_prefers_export_ending_later(ledger):
+    year = ledger.dates < np.datetime64("2025-11-01")
+    a = Ledger(ledger.dates[year], ledger.accounts, ledger.values[year], ledger.tree)
+    inner = (ledger.dates >= np.datetime64("2025-06-01")) & (ledger.dates < np.datetime64("2025-10-01"))
+    b = Ledger(ledger.dates[inner], ledger.accounts, ledger.values[inner] + 1.0, ledger.tree)
+    for parts in ([a, b], [b, a]):
+        merged = Ledger.merge(parts)
+        np.testing.assert_array_equal(merged.dates, a.dates)
+        np.testing.assert_array_equal(merged.values, a.values)
+
+    c = Ledger(ledger.dates[~year], ledger.accounts, ledger.values[~year], ledger.tree)
+    merged = Ledger.merge([c, a])
+    np.testing.assert_array_equal(merged.values, ledger.values)
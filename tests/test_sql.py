@@ -0,0 +1,68 @@
+import pytest
+
+from ledger.loader import DATA_PATH, read_export
+
+duckdb = pytest.importorskip("duckdb")
+
+from ledger.sql import LedgerDatabase  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def database():
+    return LedgerDatabase(read_export(DATA_PATH))
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT 1; SELECT 2",
+    "CREATE TABLE copy AS SELECT * FROM cells",
+    "DROP VIEW ledger",
+    "DELETE FROM cells",
+    "SET enable_external_access = true",
+    "COPY cells TO '/tmp/cells.csv'",
+    "ATTACH '/tmp/other.db'",
+    "INSTALL httpfs",
+])
+def test_only_single_selects_run(database, sql):
+    with pytest.raises(ValueError, match="single SELECT"):
+        database.query(sql)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM read_csv('/etc/passwd')",
+    f"SELECT * FROM '{DATA_PATH}'",
+])
+def test_files_cannot_be_read(database, sql):
+    with pytest.raises(ValueError, match="Permission"):
+        database.query(sql)
+
+
+# The configuration is locked once the tables are loaded, so even a statement on
+# the connection itself can neither turn file access back on nor change anything
+# else.
+@pytest.mark.parametrize("setting", ["enable_external_access = true", "lock_configuration = false", "threads = 1"])
+def test_configuration_is_locked(database, setting):
+    with pytest.raises(duckdb.Error):
+        database._db.execute(f"SET {setting}")
+    result, _ = database.query("SELECT current_setting('enable_external_access') AS access")
+    assert not result["access"][0]
+
+
+def test_row_limit_flags_truncation(database):
+    result, truncated = database.query("SELECT * FROM ledger", limit=10)
+    assert len(result) == 10 and truncated
+    result, truncated = database.query("SELECT * FROM ledger LIMIT 10", limit=10)
+    assert len(result) == 10 and not truncated
+    result, truncated = database.query("SELECT count(*) AS n FROM ledger")
+    assert result["n"][0] == database.rows and not truncated
+
+
+def test_queries_ending_in_comments_run(database):
+    result, _ = database.query("WITH a AS (SELECT 1 AS x) SELECT * FROM a -- trailing comment")
+    assert result["x"].tolist() == [1]
+
+
+def test_errors_raise_value_error(database):
+    with pytest.raises(ValueError):
+        database.query("SELECT * FROM no_such_table")
+    with pytest.raises(ValueError):
+        database.query("SELEC 1")